@@ -1,11 +1,31 @@
-from .config import Config
-from .factory import UrlFactory
-from .client import Client
-from .manager import Manager
+import importlib
+
+# Submodules are imported on first attribute access, so `import pangolin` does not
+# pull in requests or websocket until Client or Manager is actually used.
+_LAZY_ATTRIBUTES = {
+    "Config": ".config",
+    "Settings": ".config",
+    "UrlFactory": ".factory",
+    "Client": ".client",
+    "Manager": ".manager",
+}
 
 __all__ = [
     "Config",
+    "Settings",
     "UrlFactory",
     "Client",
     "Manager",
 ]
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    attribute = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = attribute # Cache so __getattr__ is not hit again
+    return attribute
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,39 +1,55 @@
+from pangolin.startup import Startup
 from pangolin import constants
 from pangolin import Config
 from pangolin import UrlFactory
 from pangolin import Client
 from pangolin import Manager
-from pathlib import Path
-import time
+from pangolin.orderbook import OrderBook
+from pangolin.orderbook import OrderBookSync
+from pangolin.price import LastPrice
+from pangolin.config import SettingsReloader
+from pangolin.profiler import SamplingProfiler
+from pangolin.telemetry import MemoryTelemetry
+from pangolin.bus import MarketDataBusWriter
+from pangolin.trigger import ExitTriggerEngine
+from pangolin.database import PartitionedDatabase
+from pangolin.database import StorageWriter
+import argparse
+import gc
+
+def main(on_manager_ready=None):
+    startup = Startup()
+    args = parse_arguments()
 
-def main():
     print("*** CONFIG ***" + "\n")
 
-    loaded_config = Config(config_file_name=constants.FileNames.CONFIG, allow_missing=False).loads()
+    config = Config(config_file_name=args.config, allow_missing=False)
+    settings = config.loads_settings(exchange_name="Binance")
 
     dynamic_urls: list[str] = []
     static_urls: list[str] = []
 
-    if is_binance_enabled(loaded_config):
-        active_exchange_name = "Binance"
-
-        if is_binance_testnet(loaded_config):
+    if settings.is_enabled:
+        if settings.is_testnet:
             binance_futures_api_host = constants.Hosts.BINANCE_TESTNET_FUTURES_API
         else:
             binance_futures_api_host = constants.Hosts.BINANCE_FUTURES_API
 
-        active_ticker = get_config_value(loaded_config, active_exchange_name, key_name="supported_coin").lower() + "usdt"
-        active_symbol = get_config_value(loaded_config, active_exchange_name, key_name="supported_coin").upper() + "USDT"
+        active_ticker = settings.active_ticker
+        active_symbol = settings.active_symbol
 
         print("\n" + "=== Ready URLs ===")
 
-        binance_futures_wss_url = UrlFactory().create_binance_futures_wss_url(host=constants.Hosts.BINANCE_FUTURES_STREAM, ticker=active_ticker)
+        if settings.ingest_mode == "kline":
+            binance_futures_wss_url = UrlFactory().create_binance_futures_kline_wss_url(host=constants.Hosts.BINANCE_FUTURES_STREAM, ticker=active_ticker, interval=settings.kline_interval)
+        else:
+            binance_futures_wss_url = UrlFactory().create_binance_futures_wss_url(host=constants.Hosts.BINANCE_FUTURES_STREAM, ticker=active_ticker)
         binance_futures_price_url = UrlFactory().create_binance_futures_price_url(host=binance_futures_api_host, symbol=active_symbol)
         binance_futures_exchange_info_url = UrlFactory().create_binance_futures_exchange_info_url(host=binance_futures_api_host, symbol=active_symbol)
 
         dynamic_urls.extend([binance_futures_wss_url, binance_futures_price_url, binance_futures_exchange_info_url])
 
-        if is_binance_testnet(loaded_config):
+        if settings.is_testnet:
             binance_futures_time_url = constants.Urls.BINANCE_TESTNET_FUTURES_TIME
             binance_futures_order_url= constants.Urls.BINANCE_TESTNET_FUTURES_ORDER
         else:
@@ -47,91 +63,151 @@ def main():
         print(f"[MAIN] Rest API URL ({binance_futures_time_url}) has been created.")
         print(f"[MAIN] Rest API URL ({binance_futures_order_url}) has been created.\n")
 
-        if is_binance_testnet(loaded_config):
-            active_api_key = get_api_key(loaded_config, active_exchange_name, is_testnet=True)
-            active_api_secret = get_api_secret(loaded_config, active_exchange_name, is_testnet=True)
-        else:
-            active_api_key = get_api_key(loaded_config, active_exchange_name, is_testnet=False)
-            active_api_secret = get_api_secret(loaded_config, active_exchange_name, is_testnet=False)
+    last_price_reference = LastPrice(max_age_ms=settings.max_price_age_ms)
+
+    order_book = None
+    order_book_sync = None
+
+    if settings.order_book_enabled:
+        order_book = OrderBook(symbol=active_symbol)
+        order_book_sync = OrderBookSync(
+            order_book=order_book,
+            depth_wss_url=UrlFactory().create_binance_futures_depth_wss_url(host=constants.Hosts.BINANCE_FUTURES_STREAM, ticker=active_ticker),
+            depth_snapshot_url=UrlFactory().create_binance_futures_depth_snapshot_url(host=binance_futures_api_host, symbol=active_symbol),
+            connect_timeout_sec=settings.connect_timeout_sec,
+            recv_timeout_sec=settings.recv_timeout_sec,
+            max_retry_wait_sec=settings.max_retry_wait_sec,
+        )
+
+    exit_trigger_engine = None
+
+    if settings.exit_trigger_enabled:
+        exit_trigger_engine = ExitTriggerEngine(backstop_enabled=settings.exit_backstop_enabled)
 
     client = Client(
         active_urls=active_urls,
         active_symbol=active_symbol,
-        active_api_key=active_api_key,
-        active_api_secret=active_api_secret,
+        active_api_key=settings.api_key,
+        active_api_secret=settings.api_secret,
+        order_book=order_book,
+        last_price_reference=last_price_reference,
+        exit_trigger_engine=exit_trigger_engine,
     )
 
+    if exit_trigger_engine is not None:
+        exit_trigger_engine.start()
+
+    storage_writer = None
+
+    if settings.storage_enabled:
+        storage_writer = StorageWriter(
+            database=PartitionedDatabase(
+                folder_path=constants.Paths.DATA / constants.DirectoryNames.PARTITIONS,
+                raw_retention_days=settings.storage_raw_retention_days,
+                rollup_seconds=settings.storage_rollup_seconds,
+                rollup_retention_days=settings.storage_rollup_retention_days,
+            )
+        )
+        storage_writer.start()
+
+    market_data_bus = None
+
+    if settings.market_data_bus_enabled:
+        market_data_bus = MarketDataBusWriter(
+            name=settings.market_data_bus_name or "pangolin_" + active_symbol.lower(),
+            slot_count=settings.market_data_bus_slots,
+        )
+
     manager = Manager(
         client=client,
         active_urls=active_urls,
-        tumbling_window_seconds=get_config_value(loaded_config, active_exchange_name, key_name="tumbling_window_seconds"),
-        max_total_loop_count=get_config_value(loaded_config, active_exchange_name, key_name="max_total_loop_count"),
-        max_display_loop_count=get_config_value(loaded_config, active_exchange_name, key_name="max_display_loop_count"),
-        connect_timeout_sec=get_config_value(loaded_config, active_exchange_name, key_name="connect_timeout_sec"),
-        recv_timeout_sec=get_config_value(loaded_config, active_exchange_name, key_name="recv_timeout_sec"),
-        max_retry_wait_sec=get_config_value(loaded_config, active_exchange_name, key_name="max_retry_wait_sec"),
+        settings=settings,
+        order_book_sync=order_book_sync,
+        last_price_reference=last_price_reference,
+        startup=startup,
+        market_data_bus=market_data_bus,
+        exit_trigger_engine=exit_trigger_engine,
+        storage_writer=storage_writer,
     )
 
+    # Re-apply configuration on SIGHUP or file change without dropping the websocket
+    settings_reloader = SettingsReloader(config=config, manager=manager, settings=settings)
+    settings_reloader.install_signal_handler()
+    settings_reloader.start()
+
+    profiler = None
+
+    if args.profile:
+        profiler = SamplingProfiler(
+            output_folder_path=constants.Paths.DATA,
+            interval_ms=args.profile_interval_ms,
+            flush_interval_sec=args.profile_flush_sec,
+            enabled=not args.profile_paused,
+        )
+        profiler.install_signal_handler()
+        profiler.start()
+        print(f"[INFO] Profiling every {args.profile_interval_ms} ms; send SIGUSR1 to pause or resume.")
+
+    telemetry = None
+
+    if args.telemetry:
+        telemetry = MemoryTelemetry(
+            output_folder_path=constants.Paths.DATA,
+            interval_sec=args.telemetry_interval_sec,
+        )
+        telemetry.install()
+        telemetry.install_signal_handler()
+        telemetry.start()
+        print(f"[INFO] Memory telemetry every {args.telemetry_interval_sec}s; send SIGUSR2 to start tracemalloc and take snapshots.")
+
+    # Lets tooling such as the soak harness observe the running Manager
+    if on_manager_ready is not None:
+        on_manager_ready(manager)
+
     print("*** MANAGER ***")
 
     if manager.response_file_exists:
         raise FileExistsError(f"[ERROR] Response file already exists: {manager.response_file_path}")
 
-    if is_binance_enabled(loaded_config):
+    if settings.is_enabled:
+        print("=== Startup Warm-up ===")
+        startup.run_warmup(
+            client=client,
+            strategy=manager.strategy,
+            stream_url=binance_futures_wss_url,
+            connect_timeout_sec=settings.connect_timeout_sec,
+        )
+
+        # Everything imported and loaded so far lives as long as the process
+        if args.gc_freeze:
+            if telemetry is not None:
+                telemetry.freeze_startup_objects()
+            else:
+                gc.collect()
+                gc.freeze()
+
         manager.run_binance_stream()
-        while Path(Paths.RESPONSE).is_file():
-            binance_futures_order_status = client.get_binance_futures_order_status()
-            if binance_futures_order_status == "FILLED":
-                side = client.get_order_side()
-            elif binance_futures_order_status == "NEW":
-                continue
-            elif binance_futures_order_status == "PARTIALLY_FILLED":
-               continue
-
-        """
-        file_path = ProjectPaths.RESPONSE
-        else:
-            client.place_binance_take_profit_order()
-            client.place_binance_stop_loss_order()
-        """
-
-def is_binance_enabled(loaded_config) -> bool:
-    if loaded_config["Binance"]["is_enabled"] == "yes":
-        return True
-    elif loaded_config["Binance"]["is_enabled"] == "no":
-        return False
-    else:
-        raise ValueError('[ERROR] Invalid value for Binance.is_enabled; expected "yes" or "no".')
-
-def is_binance_testnet(loaded_config) -> bool:
-    if loaded_config["Binance"]["is_testnet"] == "yes":
-        return True
-    elif loaded_config["Binance"]["is_testnet"] == "no":
-        return False
-    else:
-        raise ValueError('[ERROR] Invalid value for Binance.is_testnet; expected "yes" or "no".')
-
-def get_api_key(loaded_config, active_exchange_name, is_testnet:bool) -> str:
-    if active_exchange_name == "Binance":
-        if is_testnet == True:
-            active_api_key = loaded_config["Binance"]["test_api_key"]
-        elif is_testnet == False:
-            active_api_key = loaded_config["Binance"]["api_key"]
-
-    return active_api_key
-
-def get_api_secret(loaded_config, active_exchange_name, is_testnet:bool) -> str:
-    if active_exchange_name == "Binance":
-        if is_testnet == True:
-            active_api_secret = loaded_config["Binance"]["test_api_secret"]
-        elif is_testnet == False:
-            active_api_secret = loaded_config["Binance"]["api_secret"]
-
-    return active_api_secret
-
-def get_config_value(loaded_config, active_exchange_name, key_name:str) -> str:
-    config_value = loaded_config[active_exchange_name][key_name]
-    return config_value
+
+        if profiler is not None:
+            profiler.stop()
+
+        if exit_trigger_engine is not None:
+            exit_trigger_engine.stop()
+
+        if telemetry is not None:
+            telemetry.stop()
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(prog="python -m pangolin")
+    parser.add_argument("--config", default=constants.FileNames.CONFIG, help="configuration file")
+    parser.add_argument("--profile", action="store_true", help="sample all threads and write collapsed stacks to the data folder")
+    parser.add_argument("--profile-interval-ms", type=int, default=10, help="sampling interval in milliseconds")
+    parser.add_argument("--profile-flush-sec", type=int, default=60, help="how often profile files are rewritten")
+    parser.add_argument("--profile-paused", action="store_true", help="start with sampling paused until SIGUSR1")
+    parser.add_argument("--telemetry", action="store_true", help="record RSS and GC pauses to the data folder; SIGUSR2 for tracemalloc snapshots")
+    parser.add_argument("--telemetry-interval-sec", type=int, default=60, help="how often RSS and GC counters are sampled")
+    parser.add_argument("--gc-freeze", action="store_true", help="freeze objects created during startup out of GC tracking")
+    return parser.parse_args()
 
 if __name__ == '__main__':
     main()
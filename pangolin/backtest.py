@@ -0,0 +1,221 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+
+from .strategy import Strategy
+
+# Per-process state populated by the pool initializer
+_worker_signal_function = None
+_worker_window_series = None
+_worker_fee_rate = 0.0
+_worker_sharpe_scale = 1.0
+
+class Backtester:
+    """Vectorized parameter sweep over recorded window average-price series.
+
+    The strategy class must provide a static `vectorized_signals(avg_prices, **params)`
+    that returns one position (-1, 0 or 1) per window as a NumPy array.
+    """
+
+    SIGNAL_FUNCTION_NAME = "vectorized_signals"
+    MISSING_SIGNAL_FUNCTION_MESSAGE = "[ERROR] Strategy ({}) does not define {}(avg_prices, **params)."
+    SWEEP_START_MESSAGE = "[INFO] Sweeping {} parameter combinations over {} series with {} workers."
+    SWEEP_DONE_MESSAGE = "[INFO] Sweep finished in {:.2f}s ({:.0f} combinations/s)."
+
+    SECONDS_PER_YEAR = 365 * 24 * 60 * 60 # The market never closes
+
+    def __init__(self, strategy_path: str, window_series: list, fee_rate: float = 0.0, max_workers: int = None, window_sec: float = None):
+        self.strategy_path = Path(strategy_path)
+        self.window_series = [np.asarray(series, dtype=np.float64) for series in window_series]
+        self.fee_rate = float(fee_rate)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        # Sharpe ratio is per window unless the window length is known
+        self.sharpe_scale = float(np.sqrt(self.SECONDS_PER_YEAR / window_sec)) if window_sec else 1.0
+        self.sharpe_label = "sharpe/yr" if window_sec else "sharpe/win"
+
+        # Fail early in the parent process rather than in every worker
+        load_signal_function(self.strategy_path)
+
+    def run(self, parameter_grid: dict, chunk_size: int = 64) -> list:
+        parameter_names = list(parameter_grid)
+        combinations = [
+            dict(zip(parameter_names, values))
+            for values in itertools.product(*(parameter_grid[name] for name in parameter_names))
+        ]
+        chunks = [combinations[i:i + chunk_size] for i in range(0, len(combinations), chunk_size)]
+
+        print(self.SWEEP_START_MESSAGE.format(len(combinations), len(self.window_series), self.max_workers))
+        start_time = time.perf_counter()
+
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_initialize_worker,
+            initargs=(str(self.strategy_path), self.window_series, self.fee_rate, self.sharpe_scale),
+        ) as executor:
+            for chunk_results in executor.map(_evaluate_chunk, chunks):
+                results.extend(chunk_results)
+
+        elapsed = time.perf_counter() - start_time
+        print(self.SWEEP_DONE_MESSAGE.format(elapsed, len(combinations) / elapsed if elapsed > 0 else 0.0))
+
+        # Rank by total return, then by Sharpe ratio
+        results.sort(key=lambda result: (result["total_return"], result["sharpe"]), reverse=True)
+        return results
+
+    def display_results(self, results: list, top_count: int = 20) -> None:
+        print(f"{'rank':>4}  {'total_return':>12}  {self.sharpe_label:>10}  {'max_drawdown':>12}  {'trades':>6}  params")
+        for rank, result in enumerate(results[:top_count], start=1):
+            print(
+                f"{rank:>4}  {result['total_return']:>12.4%}  {result['sharpe']:>10.3f}  "
+                f"{result['max_drawdown']:>12.4%}  {result['trades']:>6}  {result['params']}"
+            )
+
+    def save_results(self, results: list, output_path: str) -> None:
+        with open(output_path, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=4, ensure_ascii=False)
+        print(f"[INFO] Sweep results written to {output_path}.")
+
+def evaluate_positions(avg_prices: np.ndarray, positions: np.ndarray, fee_rate: float) -> tuple:
+    # Position held during window i earns the return from window i to i + 1
+    window_returns = np.diff(avg_prices) / avg_prices[:-1]
+    held_positions = positions[:-1]
+    position_changes = np.abs(np.diff(positions, prepend=0.0))[:-1]
+    strategy_returns = held_positions * window_returns - position_changes * fee_rate
+
+    equity_curve = np.cumprod(1.0 + strategy_returns)
+    running_peak = np.maximum.accumulate(equity_curve)
+    max_drawdown = float(np.max(1.0 - equity_curve / running_peak)) if equity_curve.size else 0.0
+
+    return strategy_returns, max_drawdown, int(np.count_nonzero(position_changes))
+
+def load_signal_function(strategy_path: Path):
+    file_name = strategy_path.stem
+    module_name = file_name.replace("_", " ").title().replace(" ", "") # Convert snake case to pascal case
+
+    strategy_class = Strategy(strategy_folder_path=strategy_path.parent).get_strategy_class_from_file(
+        module_name=module_name,
+        strategy_path=strategy_path
+    )
+
+    signal_function = getattr(strategy_class, Backtester.SIGNAL_FUNCTION_NAME, None)
+    if signal_function is None:
+        raise AttributeError(Backtester.MISSING_SIGNAL_FUNCTION_MESSAGE.format(strategy_path, Backtester.SIGNAL_FUNCTION_NAME))
+
+    return signal_function
+
+def load_window_series(series_path: str, table_name: str = "binance") -> list:
+    """Load recorded window averages from a JSON file, a Pangolin SQLite database or a folder of day partitions."""
+    series_path = Path(series_path)
+
+    # Day partitions written by PartitionedDatabase form one continuous series
+    if series_path.is_dir():
+        avg_prices = []
+        for partition_path in sorted(series_path.glob(f"{table_name}_[0-9]*.db")):
+            avg_prices.extend(load_window_series(partition_path, table_name=table_name)[0])
+        return [avg_prices]
+
+    if series_path.suffix in (".db", ".sqlite", ".sqlite3"):
+        with closing(sqlite3.connect(series_path)) as conn:
+            # Quoted, otherwise SQLite orders by the CURRENT_TIME keyword instead of the column
+            rows = conn.execute(f'SELECT avg_price FROM {table_name} ORDER BY "current_time"').fetchall()
+        return [[row[0] for row in rows]]
+
+    with open(series_path, "r", encoding="utf-8") as json_file:
+        json_data = json.load(json_file)
+
+    # Accept either a single series or a list of series
+    if json_data and isinstance(json_data[0], (int, float)):
+        return [json_data]
+    return json_data
+
+def parse_parameter_grid(grid_arguments: list) -> dict:
+    # Each argument looks like "name=1,2,3" or "name=start:stop:step"
+    parameter_grid = {}
+    for grid_argument in grid_arguments:
+        name, raw_values = grid_argument.split("=", 1)
+        if ":" in raw_values:
+            start, stop, step = (float(value) for value in raw_values.split(":"))
+            values = np.arange(start, stop, step).tolist()
+        else:
+            values = [float(value) for value in raw_values.split(",")]
+        parameter_grid[name] = [int(value) if float(value).is_integer() else value for value in values]
+    return parameter_grid
+
+def _initialize_worker(strategy_path: str, window_series: list, fee_rate: float, sharpe_scale: float) -> None:
+    global _worker_signal_function, _worker_window_series, _worker_fee_rate, _worker_sharpe_scale
+    _worker_signal_function = load_signal_function(Path(strategy_path))
+    _worker_window_series = window_series
+    _worker_fee_rate = fee_rate
+    _worker_sharpe_scale = sharpe_scale
+
+def _evaluate_chunk(combinations: list) -> list:
+    chunk_results = []
+    for params in combinations:
+        all_returns = []
+        max_drawdown = 0.0
+        trades = 0
+        for avg_prices in _worker_window_series:
+            if avg_prices.size < 2:
+                continue
+            positions = np.asarray(_worker_signal_function(avg_prices, **params), dtype=np.float64)
+            strategy_returns, series_drawdown, series_trades = evaluate_positions(avg_prices, positions, _worker_fee_rate)
+            all_returns.append(strategy_returns)
+            max_drawdown = max(max_drawdown, series_drawdown)
+            trades += series_trades
+
+        combined_returns = np.concatenate(all_returns) if all_returns else np.zeros(0)
+        return_std = float(np.std(combined_returns)) if combined_returns.size else 0.0
+        chunk_results.append({
+            "params": params,
+            "total_return": float(np.prod(1.0 + combined_returns) - 1.0),
+            "sharpe": float(np.mean(combined_returns) / return_std * _worker_sharpe_scale) if return_std > 0 else 0.0,
+            "max_drawdown": max_drawdown,
+            "trades": trades,
+        })
+    return chunk_results
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m pangolin.backtest", description="Vectorized strategy parameter sweep")
+    parser.add_argument("--strategy", required=True, help="path to the strategy file")
+    parser.add_argument("--series", required=True, nargs="+", help="recorded window series (.json or .db)")
+    parser.add_argument("--grid", required=True, nargs="+", help='parameter values, e.g. "fast=3,5,8" or "slow=10:60:5"')
+    parser.add_argument("--table", default="binance", help="table name when reading a .db series")
+    parser.add_argument("--fee-rate", type=float, default=0.0004)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--window-sec", type=float, default=None, help="tumbling window length; annualises the Sharpe ratio (per window when omitted)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default=None, help="write the full ranked table as JSON")
+    args = parser.parse_args()
+
+    window_series = []
+    for series_path in args.series:
+        window_series.extend(load_window_series(series_path, table_name=args.table))
+
+    backtester = Backtester(
+        strategy_path=args.strategy,
+        window_series=window_series,
+        fee_rate=args.fee_rate,
+        max_workers=args.workers,
+        window_sec=args.window_sec,
+    )
+
+    results = backtester.run(parameter_grid=parse_parameter_grid(args.grid))
+    backtester.display_results(results, top_count=args.top)
+
+    if args.output:
+        backtester.save_results(results, args.output)
+
+if __name__ == '__main__':
+    main()
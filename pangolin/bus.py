@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import os
+import struct
+import time
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+# Header: magic, version, slot_count, slot_size, last published sequence number, then the writer's pid
+HEADER_FORMAT = struct.Struct("<IIIIQ")
+OWNER_PID_FORMAT = struct.Struct("<Q")
+OWNER_PID_OFFSET = HEADER_FORMAT.size
+HEADER_SIZE = 64
+BUS_MAGIC = 0x50474C42 # "PGLB"
+BUS_VERSION = 2
+
+# Slot: slot sequence, record kind, record id, three float fields, count
+SLOT_FORMAT = struct.Struct("<QB7xqdddq")
+SLOT_SIZE = 64
+SLOT_SEQUENCE_FORMAT = struct.Struct("<Q")
+
+RECORD_TRADE = 1 # id=aggTrade id, values=(price, quantity, trade time), count=0
+RECORD_WINDOW = 2 # id=window number, values=(avg price, cumulative quantity, close time), count=trades in window
+
+# Buses created by this process; their resource tracker entry belongs to the writer
+_owned_bus_names = set()
+
+class MarketDataBusWriter:
+    """Single-writer ring buffer in shared memory for decoded trades and closed windows.
+
+    Sequence protocol (per slot, seqlock style): record n goes to slot
+    n % slot_count. The writer first stores 2n - 1 in the slot's sequence
+    word (write in progress), then the payload, then 2n (published), and
+    finally n in the header. Readers never take a lock: a read is valid
+    only if the slot sequence is 2n both before and after copying the
+    payload; anything newer means the reader was lapped.
+    """
+
+    def __init__(self, name: str, slot_count: int = 65536):
+        self.name = name
+        self.slot_count = int(slot_count)
+        size = HEADER_SIZE + self.slot_count * SLOT_SIZE
+
+        try:
+            self.shared_memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Only a segment left behind by a writer that is gone may be replaced
+            remove_stale_bus(name)
+            self.shared_memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        _owned_bus_names.add(name)
+
+        self.buffer = self.shared_memory.buf
+        self.buffer[:size] = bytes(size)
+        self.sequence = 0
+        HEADER_FORMAT.pack_into(self.buffer, 0, BUS_MAGIC, BUS_VERSION, self.slot_count, SLOT_SIZE, 0)
+        OWNER_PID_FORMAT.pack_into(self.buffer, OWNER_PID_OFFSET, os.getpid())
+        print(f"[INFO] Market data bus ({name}) created with {self.slot_count} slots.")
+
+    def publish(self, kind: int, record_id: int, value_a: float, value_b: float, value_c: float, count: int = 0) -> None:
+        self.sequence += 1
+        sequence = self.sequence
+        offset = HEADER_SIZE + (sequence % self.slot_count) * SLOT_SIZE
+
+        SLOT_SEQUENCE_FORMAT.pack_into(self.buffer, offset, 2 * sequence - 1)
+        SLOT_FORMAT.pack_into(self.buffer, offset, 2 * sequence - 1, kind, record_id, value_a, value_b, value_c, count)
+        SLOT_SEQUENCE_FORMAT.pack_into(self.buffer, offset, 2 * sequence)
+        HEADER_FORMAT.pack_into(self.buffer, 0, BUS_MAGIC, BUS_VERSION, self.slot_count, SLOT_SIZE, sequence)
+
+    def publish_trade(self, trade_id: int, price: float, quantity: float, trade_time: float) -> None:
+        self.publish(RECORD_TRADE, trade_id, price, quantity, trade_time)
+
+    def publish_window(self, window_number: int, avg_price: float, cumulative_quantity: float, close_time: float, trade_count: int) -> None:
+        self.publish(RECORD_WINDOW, window_number, avg_price, cumulative_quantity, close_time, trade_count)
+
+    def close(self) -> None:
+        self.buffer = None
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+        _owned_bus_names.discard(self.name)
+
+class MarketDataBusReader:
+    """Lock-free reader; any number of processes can attach to the same bus."""
+
+    def __init__(self, name: str, from_start: bool = False):
+        self.name = name
+        self.shared_memory = attach_shared_memory(name)
+        self.buffer = self.shared_memory.buf
+
+        magic, version, self.slot_count, slot_size, last_sequence = HEADER_FORMAT.unpack_from(self.buffer, 0)
+        if magic != BUS_MAGIC or version != BUS_VERSION or slot_size != SLOT_SIZE:
+            raise ValueError(f"[ERROR] Shared memory ({name}) is not a Pangolin market data bus.")
+
+        # Start at the oldest record still in the ring, or only follow new records
+        if from_start:
+            self.next_sequence = max(1, last_sequence - self.slot_count + 1)
+        else:
+            self.next_sequence = last_sequence + 1
+        self.lost_count = 0
+
+    @property
+    def last_sequence(self) -> int:
+        return HEADER_FORMAT.unpack_from(self.buffer, 0)[4]
+
+    def poll(self, max_records: int = 4096) -> list:
+        """Return the records published since the last call as (kind, id, a, b, c, count) tuples."""
+        records = []
+        last_sequence = self.last_sequence
+
+        while self.next_sequence <= last_sequence and len(records) < max_records:
+            sequence = self.next_sequence
+            offset = HEADER_SIZE + (sequence % self.slot_count) * SLOT_SIZE
+
+            slot_sequence, kind, record_id, value_a, value_b, value_c, count = SLOT_FORMAT.unpack_from(self.buffer, offset)
+            confirmed_sequence = SLOT_SEQUENCE_FORMAT.unpack_from(self.buffer, offset)[0]
+
+            if slot_sequence == confirmed_sequence == 2 * sequence:
+                records.append((kind, record_id, value_a, value_b, value_c, count))
+                self.next_sequence += 1
+            elif confirmed_sequence > 2 * sequence:
+                # Lapped by the writer; skip to the oldest record that is still intact
+                oldest_sequence = self.last_sequence - self.slot_count + 1
+                self.lost_count += oldest_sequence - sequence
+                self.next_sequence = oldest_sequence
+            else:
+                # Write still in progress; pick it up on the next poll
+                break
+
+        return records
+
+    def follow(self, poll_interval_sec: float = 0.001):
+        while True:
+            records = self.poll()
+            if not records:
+                time.sleep(poll_interval_sec)
+            yield from records
+
+    def close(self) -> None:
+        self.buffer = None
+        self.shared_memory.close()
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # Readers must not unlink the segment when they exit (tracked by default before Python 3.13)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        attached_memory = shared_memory.SharedMemory(name=name)
+        if name not in _owned_bus_names:
+            resource_tracker.unregister(attached_memory._name, "shared_memory")
+        return attached_memory
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+def remove_stale_bus(name: str) -> None:
+    existing_memory = attach_shared_memory(name)
+    try:
+        magic, version = HEADER_FORMAT.unpack_from(existing_memory.buf, 0)[:2] if existing_memory.size >= HEADER_SIZE else (None, None)
+        if magic != BUS_MAGIC:
+            raise FileExistsError(f"[ERROR] Shared memory ({name}) exists and is not a Pangolin market data bus; choose another market_data_bus_name.")
+
+        # Version 1 buses did not record their writer
+        owner_pid = OWNER_PID_FORMAT.unpack_from(existing_memory.buf, OWNER_PID_OFFSET)[0] if version >= 2 else 0
+        if owner_pid and is_process_alive(owner_pid):
+            raise FileExistsError(f"[ERROR] Market data bus ({name}) is in use by process {owner_pid}; choose another market_data_bus_name.")
+    finally:
+        existing_memory.close()
+
+    # Left behind by a previous run that did not shut down cleanly
+    print(f"[WARN] Removing stale market data bus ({name}) left by a previous run.")
+    stale_memory = shared_memory.SharedMemory(name=name)
+    stale_memory.close()
+    stale_memory.unlink()
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m pangolin.bus", description="Print records from a Pangolin market data bus")
+    parser.add_argument("--name", required=True, help="shared memory name, e.g. pangolin_btcusdt")
+    parser.add_argument("--from-start", action="store_true", help="replay records still in the ring first")
+    parser.add_argument("--windows-only", action="store_true")
+    args = parser.parse_args()
+
+    reader = MarketDataBusReader(name=args.name, from_start=args.from_start)
+    try:
+        for kind, record_id, value_a, value_b, value_c, count in reader.follow():
+            if kind == RECORD_TRADE and not args.windows_only:
+                print(f"trade  {record_id:>12}  price {value_a:.2f}  qty {value_b:.3f}  time {value_c:.3f}")
+            elif kind == RECORD_WINDOW:
+                print(f"window {record_id:>12}  avg {value_a:.4f}  qty {value_b:.2f}  trades {count}  close {value_c:.3f}")
+    except KeyboardInterrupt:
+        print(f"[INFO] Reader stopped; {reader.lost_count} records lost to lapping.")
+    finally:
+        reader.close()
+
+if __name__ == '__main__':
+    main()
@@ -3,66 +3,157 @@ import urllib.parse
 import hashlib
 import hmac
 import json
+import threading
 import time
 from decimal import Decimal
 from decimal import ROUND_DOWN
 from pangolin import constants
+from pangolin.staging import OrderTemplate
+from pangolin.staging import WarmOrderConnection
 
 class Client:
-    def __init__(self, active_urls: list[str], active_symbol: str, active_api_key: str, active_api_secret: str):
+    def __init__(self, active_urls: list[str], active_symbol: str, active_api_key: str, active_api_secret: str, order_book=None, last_price_reference=None, exit_trigger_engine=None):
         self.active_urls = active_urls
         self.active_symbol = active_symbol
         self.active_api_key = active_api_key
         self.active_api_secret = active_api_secret
         self.response_file_path = constants.Paths.RESPONSE
+        self.order_book = order_book # Optional local order book; prices come from memory while it is synced
+        self.last_price_reference = last_price_reference # Optional last trade price published by Manager
 
-    def calculate_binance_futures_order_price(self) -> None:
-        binance_futures_price_url = self.binance_futures_price_url
-        binance_futures_exchange_info_url = self.binance_futures_exchange_info_url
-        binance_futures_symbol_info = requests.get(binance_futures_exchange_info_url).json()["symbols"][0]
+        # Assign Binance Futures URLs
+        self.binance_futures_price_url = self.active_urls[1]
+        self.binance_futures_exchange_info_url = self.active_urls[2]
+        self.binance_futures_time_url = self.active_urls[3]
+        self.binance_futures_order_url = self.active_urls[4]
+
+        # Strategies run in parallel; order placement mutates per-order state and must not interleave
+        self.order_lock = threading.Lock()
+
+        # Keep-alive session so connections opened during startup warm-up are reused for orders
+        self.session = requests.Session()
+
+        # Filled by load_binance_futures_symbol_filters() and sample_binance_server_time_offset()
+        self.binance_futures_order_tick_size = None
+        self.binance_futures_order_step_size = None
+        self.binance_futures_server_time_offset_ms = None
+
+        # Optional client-side TP/SL trigger, armed once each entry order has filled; it signs and sends through this client
+        self.exit_trigger_engine = exit_trigger_engine
+        if exit_trigger_engine is not None:
+            exit_trigger_engine.client = self
+
+        # Armed order intents by name; the warm connection is opened with the first one
+        self.order_intents = {}
+        self.order_connection = None
+
+    def load_binance_futures_symbol_filters(self) -> None:
+        binance_futures_symbol_info = self.session.get(self.binance_futures_exchange_info_url).json()["symbols"][0]
 
         for symbol_filter in binance_futures_symbol_info["filters"]:
             if symbol_filter["filterType"] == "PRICE_FILTER":
-                binance_futures_order_tick_size = Decimal(symbol_filter["tickSize"])
+                self.binance_futures_order_tick_size = Decimal(symbol_filter["tickSize"])
             elif symbol_filter["filterType"] == "LOT_SIZE":
-                binance_futures_order_step_size = Decimal(symbol_filter["stepSize"])
+                self.binance_futures_order_step_size = Decimal(symbol_filter["stepSize"])
 
-        binance_futures_latest_price = Decimal(requests.get(binance_futures_price_url).json()["price"])
+    def sample_binance_server_time_offset(self, sample_count: int = 5) -> int:
+        # Keep the sample with the smallest round trip; its midpoint is the most accurate
+        best_round_trip = None
+        for _ in range(sample_count):
+            request_time = time.time()
+            binance_futures_server_time = self.session.get(self.binance_futures_time_url).json()["serverTime"]
+            response_time = time.time()
 
-        self.binance_futures_take_profit_price = (
-            (binance_futures_latest_price * Decimal("1.060")) / binance_futures_order_tick_size
-        ).quantize(0, ROUND_DOWN) * binance_futures_order_tick_size
+            round_trip = response_time - request_time
+            if best_round_trip is None or round_trip < best_round_trip:
+                best_round_trip = round_trip
+                self.binance_futures_server_time_offset_ms = int(
+                    binance_futures_server_time - (request_time + response_time) / 2 * 1000
+                )
+
+        return self.binance_futures_server_time_offset_ms
+
+    def calculate_binance_futures_order_price(self) -> None:
+        binance_futures_price_url = self.binance_futures_price_url
+
+        # exchangeInfo is normally fetched once during startup warm-up
+        if self.binance_futures_order_tick_size is None or self.binance_futures_order_step_size is None:
+            self.load_binance_futures_symbol_filters()
+
+        binance_futures_order_tick_size = self.binance_futures_order_tick_size
+        binance_futures_order_step_size = self.binance_futures_order_step_size
+
+        binance_futures_latest_price = self.retrieve_binance_futures_latest_price(binance_futures_price_url)
+
+        self.binance_futures_take_profit_price, self.binance_futures_stop_loss_price = self.calculate_binance_futures_exit_prices(
+            side=self.side,
+            entry_price=binance_futures_latest_price
+        )
 
         self.binance_futures_order_price = (
             (binance_futures_latest_price * Decimal("1.000")) / binance_futures_order_tick_size
         ).quantize(0, ROUND_DOWN) * binance_futures_order_tick_size
 
-        self.binance_futures_stop_loss_price = (
-            (binance_futures_latest_price * Decimal("0.940")) / binance_futures_order_tick_size
-        ).quantize(0, ROUND_DOWN) * binance_futures_order_tick_size
-
         self.binance_futures_order_quantity = (
             (Decimal(self.amount_usdt) * Decimal(self.leverage) / self.binance_futures_order_price) / binance_futures_order_step_size
         ).quantize(0, ROUND_DOWN) * binance_futures_order_step_size
 
+    def calculate_binance_futures_exit_prices(self, side: str, entry_price: Decimal) -> tuple:
+        binance_futures_order_tick_size = self.binance_futures_order_tick_size
+
+        # Take profit above and stop loss below the entry for a long position, the other way round for a short
+        if side == "SELL":
+            take_profit_ratio, stop_loss_ratio = Decimal("0.940"), Decimal("1.060")
+        else:
+            take_profit_ratio, stop_loss_ratio = Decimal("1.060"), Decimal("0.940")
+
+        binance_futures_take_profit_price = (
+            (entry_price * take_profit_ratio) / binance_futures_order_tick_size
+        ).quantize(0, ROUND_DOWN) * binance_futures_order_tick_size
+
+        binance_futures_stop_loss_price = (
+            (entry_price * stop_loss_ratio) / binance_futures_order_tick_size
+        ).quantize(0, ROUND_DOWN) * binance_futures_order_tick_size
+
+        return binance_futures_take_profit_price, binance_futures_stop_loss_price
+
+    def retrieve_binance_futures_latest_price(self, binance_futures_price_url: str) -> Decimal:
+        # Read the touch price from the local order book when it is in sync and still updating
+        if self.order_book is not None and self.order_book.is_live:
+            order_book_price = self.order_book.latest_price(side=self.side)
+            if order_book_price is not None:
+                return order_book_price
+
+        # Use the stream's last trade price unless it is older than the configured threshold
+        if self.last_price_reference is not None:
+            stream_price = self.last_price_reference.fresh_price()
+            if stream_price is not None:
+                return stream_price
+            print(f"[WARN] Stream price is stale (age: {self.last_price_reference.age_sec}s), falling back to REST ticker.")
+
+        # Fall back to the REST ticker snapshot
+        return Decimal(self.session.get(binance_futures_price_url).json()["price"])
+
     def retrieve_binance_server_time(self):
-        binance_futures_server_time = requests.get(
+        # Derive server time from the sampled clock offset instead of a round trip
+        if self.binance_futures_server_time_offset_ms is not None:
+            return int(time.time() * 1000) + self.binance_futures_server_time_offset_ms
+
+        binance_futures_server_time = self.session.get(
             self.binance_futures_time_url
         ).json().get("serverTime")
 
         return binance_futures_server_time
 
     def binance_place_order(self, side: str, trade_type: str, time_in_force: str, amount_usdt: int, leverage: int) -> None:
+        with self.order_lock:
+            self.place_binance_order_locked(side, trade_type, time_in_force, amount_usdt, leverage)
+
+    def place_binance_order_locked(self, side: str, trade_type: str, time_in_force: str, amount_usdt: int, leverage: int) -> None:
         self.side = side
         self.amount_usdt = amount_usdt
         self.leverage = leverage
 
-        # Step 1: Assign Binance Futures URLs
-        self.binance_futures_price_url = self.combined_urls[1]
-        self.binance_futures_exchange_info_url = self.combined_urls[2]
-        self.binance_futures_time_url = self.combined_urls[3]
-        self.binance_futures_order_url = self.combined_urls[4]
-
         self.calculate_binance_futures_order_price()
 
         print("[Client] binance_futures_take_profit_price: " + str(self.binance_futures_take_profit_price))
@@ -92,7 +183,7 @@ class Client:
             hashlib.sha256
         ).hexdigest()
 
-        binance_futures_order_response = requests.post(
+        binance_futures_order_response = self.session.post(
             self.binance_futures_order_url,
             headers={"X-MBX-APIKEY": self.active_api_key},
             data=binance_futures_order_params
@@ -104,6 +195,117 @@ class Client:
             with open(self.response_file_path, "w", encoding="utf-8") as json_file:
                 json.dump(self.binance_futures_order_response_json_data, json_file, indent=4, ensure_ascii=False)
 
+            # Accepted is not filled; the engine arms for the executed quantity once the order fills
+            if self.exit_trigger_engine is not None:
+                self.exit_trigger_engine.watch_entry(
+                    side=side,
+                    order_response=self.binance_futures_order_response_json_data,
+                    take_profit_price=self.binance_futures_take_profit_price,
+                    stop_loss_price=self.binance_futures_stop_loss_price,
+                )
+
+    def arm_order_intent(self, name: str, side: str, trade_type: str, time_in_force: str, amount_usdt: int, leverage: int) -> OrderTemplate:
+        """Stage an order ahead of its trigger; fire_order_intent() then only fills in price, timestamp and signature."""
+        with self.order_lock:
+            # Same warm-up work binance_place_order would otherwise do at trigger time
+            if self.binance_futures_order_tick_size is None or self.binance_futures_order_step_size is None:
+                self.load_binance_futures_symbol_filters()
+            if self.binance_futures_server_time_offset_ms is None:
+                self.sample_binance_server_time_offset()
+
+            self.side = side
+            reference_price = self.retrieve_binance_futures_latest_price(self.binance_futures_price_url)
+            quantity = (
+                (Decimal(amount_usdt) * Decimal(leverage) / reference_price) / self.binance_futures_order_step_size
+            ).quantize(0, ROUND_DOWN) * self.binance_futures_order_step_size
+
+            order_template = OrderTemplate(
+                name=name,
+                symbol=self.active_symbol,
+                side=side,
+                trade_type=trade_type,
+                time_in_force=time_in_force,
+                quantity=quantity,
+                leverage=leverage,
+                tick_size=self.binance_futures_order_tick_size,
+                api_key=self.active_api_key,
+                api_secret=self.active_api_secret,
+                order_url=self.binance_futures_order_url,
+            )
+
+            if self.order_connection is None:
+                self.order_connection = WarmOrderConnection(
+                    order_url=self.binance_futures_order_url,
+                    keepalive_path=urllib.parse.urlparse(self.binance_futures_time_url).path,
+                )
+                self.order_connection.start()
+
+        self.order_intents[name] = order_template
+        return order_template
+
+    def fire_order_intent(self, name: str, price: float = None) -> bool:
+        fired_at = time.perf_counter()
+
+        if name not in self.order_intents:
+            return False
+
+        # No REST fallback here: a staged order is priced from the caller or from a fresh stream price
+        if price is None:
+            stream_price = self.last_price_reference.fresh_price() if self.last_price_reference is not None else None
+            if stream_price is None:
+                price_age_sec = self.last_price_reference.age_sec if self.last_price_reference is not None else None
+                print(f"[WARN] Order intent {name} not fired: stream price is missing or stale (age: {price_age_sec}s).")
+                return False
+            price = float(stream_price)
+
+        # An intent fires once; a repeated trigger without re-arming is a no-op
+        order_template = self.order_intents.pop(name, None)
+        if order_template is None:
+            return False
+        timestamp = int(time.time() * 1000) + self.binance_futures_server_time_offset_ms
+
+        self.order_connection.send(
+            order_template.render(price, timestamp),
+            on_response=lambda status_code, body: self.handle_order_intent_response(order_template, price, status_code, body),
+            fired_at=fired_at,
+        )
+        return True
+
+    def handle_order_intent_response(self, order_template: OrderTemplate, price: float, status_code, body: bytes) -> None:
+        if status_code is None:
+            # Connection dropped after the request was written; the order may or may not have reached the exchange
+            print(f"[ERROR] Order intent {order_template.name}: connection lost before the response; check open orders.")
+            return
+        if status_code != 200:
+            print(f"[ERROR] Order intent {order_template.name} failed: {status_code} {body.decode('utf-8', 'replace')}")
+            return
+
+        self.binance_futures_order_response_json_data = json.loads(body)
+        self.binance_futures_order_response_json_data["source"] = 'binanceFutures'
+        with open(self.response_file_path, "w", encoding="utf-8") as json_file:
+            json.dump(self.binance_futures_order_response_json_data, json_file, indent=4, ensure_ascii=False)
+
+        if self.exit_trigger_engine is not None:
+            take_profit_price, stop_loss_price = self.calculate_binance_futures_exit_prices(
+                side=order_template.side,
+                entry_price=Decimal(order_template.format_price(price))
+            )
+            self.exit_trigger_engine.watch_entry(
+                side=order_template.side,
+                order_response=self.binance_futures_order_response_json_data,
+                take_profit_price=take_profit_price,
+                stop_loss_price=stop_loss_price,
+            )
+
+    def sign_binance_params(self, params: dict) -> dict:
+        # Append the HMAC-SHA256 signature of the urlencoded parameters
+        params["signature"] = hmac.new(
+            self.active_api_secret.encode("utf-8"),
+            urllib.parse.urlencode(params).encode("utf-8"),
+            hashlib.sha256
+        ).hexdigest()
+        return params
+
     def create_binance_futures_order_json(
         self,
         symbol: str,
@@ -138,10 +340,17 @@ class Client:
         return json.dumps(order_dict, indent=4)
 
     def get_binance_futures_order_status(self) -> str:
+        binance_futures_order_response_json_data = self.retrieve_binance_futures_order(
+            order_id=self.binance_futures_order_response_json_data["orderId"]
+        )
+        if binance_futures_order_response_json_data is not None:
+            return binance_futures_order_response_json_data["status"]
+
+    def retrieve_binance_futures_order(self, order_id: int):
         binance_futures_order_status_params = {
-            "symbol": self.binance_futures_order_response_json_data["symbol"],
-            "orderId": self.binance_futures_order_response_json_data["orderId"],
-            "timestamp": requests.get(self.binance_futures_time_url).json().get("serverTime")
+            "symbol": self.active_symbol,
+            "orderId": order_id,
+            "timestamp": self.retrieve_binance_server_time()
         }
 
         binance_futures_order_status_params["signature"] = hmac.new(
@@ -150,15 +359,14 @@ class Client:
             hashlib.sha256
         ).hexdigest()
 
-        binance_futures_order_status_response = requests.get(
+        binance_futures_order_status_response = self.session.get(
             self.binance_futures_order_url,
             headers={"X-MBX-APIKEY": self.active_api_key},
             params=binance_futures_order_status_params
         )
 
         if binance_futures_order_status_response.status_code == 200:
-            binance_futures_order_response_json_data = binance_futures_order_status_response.json()
-            return binance_futures_order_response_json_data["status"]
+            return binance_futures_order_status_response.json()
 
     def get_order_side(self):
         return self.side
@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import json
+import queue
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pangolin import constants
+from pangolin.factory import UrlFactory
+from pangolin.stream import StreamFeed
+
+KLINE_INTERVAL_MS = {"1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000, "1h": 3_600_000}
+
+def read_cpu_sec() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+class IngestMeter:
+    """Consume one stream for a fixed time and record its cost and per-kline averages.
+
+    Runs in its own process so the CPU time (websocket frame decoding, JSON
+    parsing and aggregation) belongs to exactly one ingest mode.
+    """
+
+    def __init__(self, mode: str, ticker: str, interval: str, duration_sec: float):
+        self.mode = mode
+        self.interval_ms = KLINE_INTERVAL_MS[interval]
+        self.duration_sec = duration_sec
+
+        if mode == "kline":
+            wss_url = UrlFactory().create_binance_futures_kline_wss_url(host=constants.Hosts.BINANCE_FUTURES_STREAM, ticker=ticker, interval=interval)
+        else:
+            wss_url = UrlFactory().create_binance_futures_wss_url(host=constants.Hosts.BINANCE_FUTURES_STREAM, ticker=ticker)
+        self.stream_feed = StreamFeed(wss_url=wss_url, connect_timeout_sec=10, recv_timeout_sec=10, max_retry_wait_sec=30)
+
+        self.message_count = 0
+        self.byte_count = 0
+        self.buckets = {} # kline start time (ms) -> [price sum or VWAP * n, trade count]
+
+    def run(self) -> dict:
+        self.stream_feed.start()
+        cpu_started_at = read_cpu_sec()
+        deadline = time.monotonic() + self.duration_sec
+
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    raw_message = self.stream_feed.recv(timeout=1.0)
+                except queue.Empty:
+                    continue
+
+                self.message_count += 1
+                self.byte_count += len(raw_message)
+                if self.mode == "kline":
+                    self.process_kline(raw_message)
+                else:
+                    self.process_agg_trade(raw_message)
+        finally:
+            self.stream_feed.stop()
+
+        return {
+            "mode": self.mode,
+            "duration_sec": self.duration_sec,
+            "messages": self.message_count,
+            "bytes": self.byte_count,
+            "cpu_sec": read_cpu_sec() - cpu_started_at,
+            "buckets": {str(start_time): values for start_time, values in self.buckets.items()},
+        }
+
+    def process_agg_trade(self, raw_message: str) -> None:
+        json_data = json.loads(raw_message)
+        if json_data.get("e") != "aggTrade":
+            return
+        start_time = int(json_data["T"]) // self.interval_ms * self.interval_ms
+        bucket = self.buckets.setdefault(start_time, [0.0, 0])
+        bucket[0] += float(json_data["p"])
+        bucket[1] += 1
+
+    def process_kline(self, raw_message: str) -> None:
+        json_data = json.loads(raw_message)
+        if json_data.get("e") != "kline" or not json_data["k"]["x"]:
+            return
+        kline = json_data["k"]
+        volume = float(kline["v"])
+        vwap_price = float(kline["q"]) / volume if volume > 0 else float(kline["c"])
+        self.buckets[int(kline["t"])] = [vwap_price * int(kline["n"]), int(kline["n"])]
+
+def compare_accuracy(agg_trade_buckets: dict, kline_buckets: dict) -> list:
+    # The first and last aggTrade buckets only cover part of a kline
+    complete_start_times = sorted(agg_trade_buckets)[1:-1]
+
+    differences_bps = []
+    for start_time in complete_start_times:
+        if start_time not in kline_buckets:
+            continue
+        agg_price_sum, agg_count = agg_trade_buckets[start_time]
+        kline_price_sum, kline_count = kline_buckets[start_time]
+        if agg_count == 0 or kline_count == 0:
+            continue
+        agg_avg_price = agg_price_sum / agg_count
+        kline_avg_price = kline_price_sum / kline_count
+        differences_bps.append((kline_avg_price - agg_avg_price) / agg_avg_price * 10_000)
+    return differences_bps
+
+def run_worker(mode: str, args) -> dict:
+    completed = subprocess.run(
+        [
+            sys.executable, "-m", "pangolin.compare",
+            "--worker-mode", mode,
+            "--coin", args.coin,
+            "--interval", args.interval,
+            "--duration-sec", str(args.duration_sec),
+        ] + (["--simulator", args.simulator] if args.simulator else []),
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    # The summary is the last line; everything before it is connection logging
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def display_report(agg_trade_summary: dict, kline_summary: dict, differences_bps: list) -> None:
+    print("=== Ingest Mode Comparison ===")
+    print(f"{'mode':<10}  {'messages':>10}  {'msg/s':>8}  {'KiB':>10}  {'cpu s':>8}  {'cpu %':>6}")
+    for summary in (agg_trade_summary, kline_summary):
+        duration_sec = summary["duration_sec"]
+        print(
+            f"{summary['mode']:<10}  {summary['messages']:>10}  {summary['messages'] / duration_sec:>8.1f}  "
+            f"{summary['bytes'] / 1024:>10.1f}  {summary['cpu_sec']:>8.3f}  {summary['cpu_sec'] / duration_sec:>6.2%}"
+        )
+
+    if kline_summary["messages"] and kline_summary["cpu_sec"] > 0:
+        print(f"[INFO] kline mode: {agg_trade_summary['messages'] / kline_summary['messages']:.0f}x fewer messages, "
+              f"{agg_trade_summary['cpu_sec'] / kline_summary['cpu_sec']:.1f}x less CPU.")
+
+    if not differences_bps:
+        print("[WARN] No complete kline overlapped both runs; use a longer --duration-sec.")
+        return
+    mean_abs_bps = sum(abs(difference) for difference in differences_bps) / len(differences_bps)
+    print(f"[INFO] kline VWAP vs aggTrade mean over {len(differences_bps)} klines: "
+          f"mean |diff| {mean_abs_bps:.2f} bps, max |diff| {max(abs(difference) for difference in differences_bps):.2f} bps")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m pangolin.compare", description="Compare CPU use and accuracy of the aggTrade and kline ingest modes")
+    parser.add_argument("--coin", default="btc")
+    parser.add_argument("--interval", default="1m", choices=sorted(KLINE_INTERVAL_MS))
+    parser.add_argument("--duration-sec", type=float, default=600.0, help="needs at least three kline intervals for an accuracy figure")
+    parser.add_argument("--simulator", help="HOST:PORT of a local pangolin.simulator stream instead of Binance")
+    parser.add_argument("--worker-mode", choices=("aggTrade", "kline"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    ticker = args.coin.lower() + "usdt"
+
+    if args.simulator:
+        constants.Schemes.WEBSOCKET = "ws://"
+        constants.Hosts.BINANCE_FUTURES_STREAM = args.simulator
+
+    if args.worker_mode:
+        summary = IngestMeter(args.worker_mode, ticker, args.interval, args.duration_sec).run()
+        print(json.dumps(summary))
+        return
+
+    # Both modes run at the same time in separate processes, so they see the same market
+    print(f"[INFO] Recording {ticker} in aggTrade and kline_{args.interval} mode for {args.duration_sec:.0f}s.")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        agg_trade_future = executor.submit(run_worker, "aggTrade", args)
+        kline_future = executor.submit(run_worker, "kline", args)
+        agg_trade_summary = agg_trade_future.result()
+        kline_summary = kline_future.result()
+
+    agg_trade_buckets = {int(start_time): values for start_time, values in agg_trade_summary["buckets"].items()}
+    kline_buckets = {int(start_time): values for start_time, values in kline_summary["buckets"].items()}
+    display_report(agg_trade_summary, kline_summary, compare_accuracy(agg_trade_buckets, kline_buckets))
+
+if __name__ == '__main__':
+    main()
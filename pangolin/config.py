@@ -1,7 +1,14 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import configparser
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from dataclasses import fields
+from dataclasses import replace
 from pathlib import Path
+from typing import ClassVar
 
 class Config:
     LOAD_SUCCESS_MESSAGE = "[INFO] Pangolin configuration file ({}) loaded."
@@ -24,6 +31,242 @@ class Config:
             print(self.LOAD_SUCCESS_MESSAGE.format(self.config_path))
             return self.config
 
+    def loads_settings(self, exchange_name: str = "Binance") -> "Settings":
+        # Start from a fresh parser so removed keys do not survive a reload
+        self.config = configparser.ConfigParser()
+        return Settings.from_config(self.loads(), exchange_name=exchange_name)
+
     def display_message(self, message):
-        print() # add a line break for console readability 
+        print() # add a line break for console readability
         print(message)
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed and validated view of one exchange section, parsed once from the config file."""
+
+    # Settings that Manager can pick up while the websocket stays connected
+    RELOADABLE_FIELDS: ClassVar[tuple] = (
+        "tumbling_window_seconds",
+        "max_total_loop_count",
+        "max_display_loop_count",
+        "connect_timeout_sec",
+        "recv_timeout_sec",
+        "max_retry_wait_sec",
+        "indicator_period",
+        "max_price_age_ms",
+    )
+
+    exchange_name: str
+    is_enabled: bool
+    is_testnet: bool
+    supported_coin: str
+    api_key: str
+    api_secret: str
+    tumbling_window_seconds: int
+    max_total_loop_count: int
+    max_display_loop_count: int
+    connect_timeout_sec: int
+    recv_timeout_sec: int
+    max_retry_wait_sec: int
+    indicator_period: int = 20
+    order_book_enabled: bool = False
+    max_price_age_ms: int = 500
+    config_watch_interval_sec: int = 2
+    standby_connection_enabled: bool = False
+    rotate_connection_after_sec: int = 84600 # 23.5 hours, ahead of Binance's 24h disconnect
+    market_data_bus_enabled: bool = False
+    market_data_bus_name: str = "" # Defaults to pangolin_<symbol>
+    market_data_bus_slots: int = 65536
+    ingest_mode: str = "aggTrade" # "aggTrade" or "kline"
+    kline_interval: str = "1m"
+    exit_trigger_enabled: bool = False
+    exit_backstop_enabled: bool = True # Exchange-side stop orders behind the local trigger
+    storage_enabled: bool = False
+    storage_raw_retention_days: int = 7 # 0 keeps raw day partitions forever
+    storage_rollup_seconds: int = 60
+    storage_rollup_retention_days: int = 365 # 0 keeps rolled-up bars forever
+    quantile_sketch_enabled: bool = False
+    quantile_sketch_k: int = 200 # Rank error is about 1.7 / k
+    quantile_sketch_history: int = 60 # Closed windows kept for merging
+
+    INGEST_MODES: ClassVar[tuple] = ("aggTrade", "kline")
+    KLINE_INTERVAL_UNITS: ClassVar[dict] = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+    @classmethod
+    def from_config(cls, loaded_config: configparser.ConfigParser, exchange_name: str = "Binance") -> "Settings":
+        if loaded_config is None or not loaded_config.has_section(exchange_name):
+            raise ValueError(f"[ERROR] Missing [{exchange_name}] section in configuration.")
+
+        section = loaded_config[exchange_name]
+        is_testnet = parse_yes_no(section, exchange_name, "is_testnet")
+
+        return cls(
+            exchange_name=exchange_name,
+            is_enabled=parse_yes_no(section, exchange_name, "is_enabled"),
+            is_testnet=is_testnet,
+            supported_coin=parse_str(section, exchange_name, "supported_coin"),
+            api_key=parse_str(section, exchange_name, "test_api_key" if is_testnet else "api_key"),
+            api_secret=parse_str(section, exchange_name, "test_api_secret" if is_testnet else "api_secret"),
+            tumbling_window_seconds=parse_positive_int(section, exchange_name, "tumbling_window_seconds"),
+            max_total_loop_count=parse_positive_int(section, exchange_name, "max_total_loop_count"),
+            max_display_loop_count=parse_positive_int(section, exchange_name, "max_display_loop_count"),
+            connect_timeout_sec=parse_positive_int(section, exchange_name, "connect_timeout_sec"),
+            recv_timeout_sec=parse_positive_int(section, exchange_name, "recv_timeout_sec"),
+            max_retry_wait_sec=parse_positive_int(section, exchange_name, "max_retry_wait_sec"),
+            indicator_period=parse_positive_int(section, exchange_name, "indicator_period", default=cls.indicator_period),
+            order_book_enabled=parse_yes_no(section, exchange_name, "order_book_enabled", default="no"),
+            max_price_age_ms=parse_positive_int(section, exchange_name, "max_price_age_ms", default=cls.max_price_age_ms),
+            config_watch_interval_sec=parse_non_negative_int(
+                section, exchange_name, "config_watch_interval_sec", default=cls.config_watch_interval_sec
+            ),
+            standby_connection_enabled=parse_yes_no(section, exchange_name, "standby_connection_enabled", default="no"),
+            rotate_connection_after_sec=parse_positive_int(
+                section, exchange_name, "rotate_connection_after_sec", default=cls.rotate_connection_after_sec
+            ),
+            market_data_bus_enabled=parse_yes_no(section, exchange_name, "market_data_bus_enabled", default="no"),
+            market_data_bus_name=section.get("market_data_bus_name", cls.market_data_bus_name).strip(),
+            market_data_bus_slots=parse_positive_int(section, exchange_name, "market_data_bus_slots", default=cls.market_data_bus_slots),
+            ingest_mode=section.get("ingest_mode", cls.ingest_mode).strip(),
+            kline_interval=section.get("kline_interval", cls.kline_interval).strip(),
+            exit_trigger_enabled=parse_yes_no(section, exchange_name, "exit_trigger_enabled", default="no"),
+            exit_backstop_enabled=parse_yes_no(section, exchange_name, "exit_backstop_enabled", default="yes"),
+            storage_enabled=parse_yes_no(section, exchange_name, "storage_enabled", default="no"),
+            storage_raw_retention_days=parse_non_negative_int(section, exchange_name, "storage_raw_retention_days", default=cls.storage_raw_retention_days),
+            storage_rollup_seconds=parse_positive_int(section, exchange_name, "storage_rollup_seconds", default=cls.storage_rollup_seconds),
+            storage_rollup_retention_days=parse_non_negative_int(section, exchange_name, "storage_rollup_retention_days", default=cls.storage_rollup_retention_days),
+            quantile_sketch_enabled=parse_yes_no(section, exchange_name, "quantile_sketch_enabled", default="no"),
+            quantile_sketch_k=parse_positive_int(section, exchange_name, "quantile_sketch_k", default=cls.quantile_sketch_k),
+            quantile_sketch_history=parse_positive_int(section, exchange_name, "quantile_sketch_history", default=cls.quantile_sketch_history),
+        )
+
+    def __post_init__(self):
+        if self.ingest_mode not in self.INGEST_MODES:
+            raise ValueError(f'[ERROR] Invalid value for {self.exchange_name}.ingest_mode; expected "aggTrade" or "kline".')
+
+        # Raises ValueError for an unknown interval
+        kline_interval_seconds = self.kline_interval_seconds
+
+        if self.ingest_mode == "kline" and self.tumbling_window_seconds % kline_interval_seconds != 0:
+            raise ValueError(
+                f"[ERROR] {self.exchange_name}.tumbling_window_seconds ({self.tumbling_window_seconds}) "
+                f"must be a multiple of kline_interval ({self.kline_interval}) in kline mode."
+            )
+
+    @property
+    def active_ticker(self) -> str:
+        return self.supported_coin.lower() + "usdt"
+
+    @property
+    def active_symbol(self) -> str:
+        return self.supported_coin.upper() + "USDT"
+
+    @property
+    def kline_interval_seconds(self) -> int:
+        # Binance futures intervals such as 1m, 15m, 4h, 1d
+        amount, unit = self.kline_interval[:-1], self.kline_interval[-1:]
+        if not amount.isdigit() or unit not in self.KLINE_INTERVAL_UNITS:
+            raise ValueError(f"[ERROR] Invalid value for {self.exchange_name}.kline_interval; expected e.g. 1m, 5m or 1h.")
+        return int(amount) * self.KLINE_INTERVAL_UNITS[unit]
+
+    def changed_fields(self, other: "Settings") -> list[str]:
+        return [field.name for field in fields(self) if getattr(self, field.name) != getattr(other, field.name)]
+
+def parse_str(section, exchange_name: str, key_name: str) -> str:
+    if key_name not in section or not section[key_name].strip():
+        raise ValueError(f"[ERROR] Missing value for {exchange_name}.{key_name}.")
+    return section[key_name].strip()
+
+def parse_yes_no(section, exchange_name: str, key_name: str, default: str = None) -> bool:
+    value = section.get(key_name, default)
+    if value == "yes":
+        return True
+    elif value == "no":
+        return False
+    else:
+        raise ValueError(f'[ERROR] Invalid value for {exchange_name}.{key_name}; expected "yes" or "no".')
+
+def parse_non_negative_int(section, exchange_name: str, key_name: str, default: int = None) -> int:
+    value = section.get(key_name, None if default is None else str(default))
+    try:
+        parsed_value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"[ERROR] Invalid value for {exchange_name}.{key_name}; expected an integer, got {value!r}.")
+    if parsed_value < 0:
+        raise ValueError(f"[ERROR] Invalid value for {exchange_name}.{key_name}; expected a non-negative integer.")
+    return parsed_value
+
+def parse_positive_int(section, exchange_name: str, key_name: str, default: int = None) -> int:
+    parsed_value = parse_non_negative_int(section, exchange_name, key_name, default=default)
+    if parsed_value == 0:
+        raise ValueError(f"[ERROR] Invalid value for {exchange_name}.{key_name}; expected a positive integer.")
+    return parsed_value
+
+class SettingsReloader(threading.Thread):
+    """Re-read the config file on SIGHUP or when it changes and hand valid settings to Manager.
+
+    Invalid files are reported and ignored, so the running settings stay in place.
+    """
+
+    RELOAD_MESSAGE = "[INFO] Configuration reloaded ({}); changed: {}"
+    RELOAD_FAILED_MESSAGE = "[WARN] Configuration reload ignored: {}"
+    NOT_RELOADABLE_MESSAGE = "[WARN] {} cannot change at runtime; restart to apply it."
+
+    def __init__(self, config: Config, manager, settings: Settings):
+        super().__init__(name="SettingsReloader", daemon=True)
+        self.config = config
+        self.manager = manager
+        self.settings = settings
+        self.reload_event = threading.Event()
+        self.last_mtime_ns = self.read_mtime_ns()
+
+    def install_signal_handler(self) -> None:
+        # signal.signal() is only allowed from the main thread
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload_event.set())
+
+    def read_mtime_ns(self):
+        try:
+            return os.stat(self.config.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def run(self) -> None:
+        while True:
+            # Interval 0 disables file polling; SIGHUP still works
+            wait_timeout = self.settings.config_watch_interval_sec or None
+            triggered_by_signal = self.reload_event.wait(wait_timeout)
+            self.reload_event.clear()
+
+            mtime_ns = self.read_mtime_ns()
+            if not triggered_by_signal and mtime_ns == self.last_mtime_ns:
+                continue
+            self.last_mtime_ns = mtime_ns
+
+            self.reload("SIGHUP" if triggered_by_signal else "file change")
+
+    def reload(self, reason: str) -> None:
+        try:
+            new_settings = self.config.loads_settings(exchange_name=self.settings.exchange_name)
+        except (ValueError, FileNotFoundError, configparser.Error) as error:
+            print(self.RELOAD_FAILED_MESSAGE.format(error))
+            return
+
+        changed_fields = new_settings.changed_fields(self.settings)
+        fixed_fields = [
+            name for name in changed_fields
+            if name not in Settings.RELOADABLE_FIELDS and name != "config_watch_interval_sec"
+        ]
+        if fixed_fields:
+            print(self.NOT_RELOADABLE_MESSAGE.format(", ".join(fixed_fields)))
+            # Keep the running values, so they are reported again until the process restarts
+            try:
+                new_settings = replace(new_settings, **{name: getattr(self.settings, name) for name in fixed_fields})
+            except ValueError as error:
+                # A reloadable value that only fits the new restart-only ones
+                print(self.RELOAD_FAILED_MESSAGE.format(error))
+                return
+
+        applied_fields = [name for name in changed_fields if name not in fixed_fields]
+        self.settings = new_settings
+        self.manager.request_settings(new_settings)
+        print(self.RELOAD_MESSAGE.format(reason, ", ".join(applied_fields) or "nothing"))
@@ -14,8 +14,10 @@ class FileNames:
 class DirectoryNames:
     DATA = "data"
     STRATEGY = "strategies"
+    PARTITIONS = "partitions"
 
 class Paths:
+    DATA = Path(Project.NAME) / DirectoryNames.DATA
     RESPONSE = Path(Project.NAME) / DirectoryNames.DATA / FileNames.RESPONSE
     STRATEGY = Path(Project.NAME) / DirectoryNames.STRATEGY
 
@@ -24,12 +26,16 @@ class Hosts:
     BINANCE_FUTURES_API = "fapi.binance.com"
     BINANCE_TESTNET_FUTURES_API = "testnet.binancefuture.com"
 
+class Schemes:
+    WEBSOCKET = "wss://"
+    REST = "https://"
+
 class Endpoints:
     BINANCE_FUTURES_TIME = "/fapi/v1/time"
     BINANCE_FUTURES_ORDER = "/fapi/v1/order"
 
 class Urls:
-    BINANCE_FUTURES_TIME = "https://" + Hosts.BINANCE_FUTURES_API + Endpoints.BINANCE_FUTURES_TIME
-    BINANCE_TESTNET_FUTURES_TIME = "https://" + Hosts.BINANCE_TESTNET_FUTURES_API + Endpoints.BINANCE_FUTURES_TIME
-    BINANCE_FUTURES_ORDER = "https://" + Hosts.BINANCE_FUTURES_API + Endpoints.BINANCE_FUTURES_ORDER
-    BINANCE_TESTNET_FUTURES_ORDER = "https://" + Hosts.BINANCE_TESTNET_FUTURES_API + Endpoints.BINANCE_FUTURES_ORDER
+    BINANCE_FUTURES_TIME = Schemes.REST + Hosts.BINANCE_FUTURES_API + Endpoints.BINANCE_FUTURES_TIME
+    BINANCE_TESTNET_FUTURES_TIME = Schemes.REST + Hosts.BINANCE_TESTNET_FUTURES_API + Endpoints.BINANCE_FUTURES_TIME
+    BINANCE_FUTURES_ORDER = Schemes.REST + Hosts.BINANCE_FUTURES_API + Endpoints.BINANCE_FUTURES_ORDER
+    BINANCE_TESTNET_FUTURES_ORDER = Schemes.REST + Hosts.BINANCE_TESTNET_FUTURES_API + Endpoints.BINANCE_FUTURES_ORDER
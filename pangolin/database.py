@@ -1,9 +1,15 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import closing
 from datetime import datetime
+from datetime import timezone
 from dataclasses import dataclass
+from pathlib import Path
 
 @dataclass(frozen=True)
 class SqlFileNames:
@@ -67,3 +73,342 @@ class Database:
     def load_sql_file(self, file_name: str) -> str:
         with open(file_name, "r", encoding="utf-8") as sql_file:
             return sql_file.read()
+
+class PartitionedDatabase:
+    """Trade and window storage split into one SQLite file per UTC day.
+
+    Writes only ever touch the current day's file and queries only open the
+    days they cover, so neither slows down as history grows. Retention
+    removes whole day files instead of running row deletes. Finished days
+    are rolled up into `rollup_seconds` OHLCV bars in a separate rollup
+    file, one bounded batch at a time, and a raw day is only removed once
+    its rollup is complete.
+    """
+
+    PARTITION_CREATED_MESSAGE = "[INFO] Storage partition ({}) created."
+    PARTITION_DROPPED_MESSAGE = "[INFO] Storage partition ({}) dropped after {} days."
+    PARTITION_COMPACTED_MESSAGE = "[INFO] Storage partition ({}) rolled up into {}s bars."
+
+    PARTITION_FILE_FORMAT = "{}_{}.db" # table name, YYYYMMDD
+    ROLLUP_FILE_FORMAT = "{}_rollup.db"
+
+    def __init__(
+        self,
+        folder_path: Path,
+        table_name: str = "binance",
+        raw_retention_days: int = 7,
+        rollup_seconds: int = 60,
+        rollup_retention_days: int = 365,
+    ):
+        self.folder_path = Path(folder_path)
+        self.folder_path.mkdir(parents=True, exist_ok=True)
+        self.table_name = table_name # Window table; same name and columns as Database, so backtest can read a partition
+        self.trades_table_name = table_name + "_trades"
+        self.raw_retention_days = raw_retention_days # 0 keeps raw partitions forever
+        self.rollup_seconds = rollup_seconds
+        self.rollup_retention_days = rollup_retention_days # 0 keeps bars forever
+
+        # Only the partitions written to recently stay open
+        self.partition_connections = {} # day -> sqlite3.Connection
+
+        # Opened by the caller's thread but afterwards only used by StorageWriter
+        self.rollup_conn = sqlite3.connect(self.folder_path / self.ROLLUP_FILE_FORMAT.format(table_name), check_same_thread=False)
+        self.rollup_conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL,
+                bar_seconds INTEGER NOT NULL,
+                bar_start INTEGER NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume REAL NOT NULL,
+                quote_volume REAL NOT NULL,
+                trade_count INTEGER NOT NULL,
+                PRIMARY KEY (symbol, bar_seconds, bar_start)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS compaction_progress (
+                day TEXT PRIMARY KEY,
+                last_trade_id INTEGER NOT NULL,
+                is_done INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+
+    @staticmethod
+    def day_of(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y%m%d")
+
+    def partition_path(self, day: str) -> Path:
+        return self.folder_path / self.PARTITION_FILE_FORMAT.format(self.table_name, day)
+
+    def list_partition_days(self) -> list[str]:
+        prefix_length = len(self.table_name) + 1
+        return sorted(
+            path.stem[prefix_length:]
+            for path in self.folder_path.glob(self.PARTITION_FILE_FORMAT.format(self.table_name, "[0-9]" * 8))
+        )
+
+    def open_partition(self, day: str) -> sqlite3.Connection:
+        conn = self.partition_connections.get(day)
+        if conn is not None:
+            return conn
+
+        is_new = not self.partition_path(day).exists()
+        conn = sqlite3.connect(self.partition_path(day))
+        conn.executescript(f"""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS {self.trades_table_name} (
+                trade_id INTEGER PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                price REAL NOT NULL,
+                quantity REAL NOT NULL,
+                trade_time REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                avg_price REAL NOT NULL,
+                cumulative_quantity REAL NOT NULL,
+                "current_time" REAL NOT NULL
+            );
+        """)
+        if is_new:
+            print(self.PARTITION_CREATED_MESSAGE.format(self.partition_path(day).name))
+
+        # Keep today's and yesterday's connection (late trades around midnight); close the rest
+        for open_day in sorted(self.partition_connections)[:-1]:
+            self.partition_connections.pop(open_day).close()
+        self.partition_connections[day] = conn
+        return conn
+
+    def insert_trades(self, trade_rows: list) -> None:
+        # trade_rows: (trade_id, symbol, price, quantity, trade_time); a batch can straddle midnight
+        rows_by_day = {}
+        for trade_row in trade_rows:
+            rows_by_day.setdefault(self.day_of(trade_row[4]), []).append(trade_row)
+
+        for day, day_rows in rows_by_day.items():
+            conn = self.open_partition(day)
+            changes_before = conn.total_changes
+            with conn:
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {self.trades_table_name} (trade_id, symbol, price, quantity, trade_time) VALUES (?, ?, ?, ?, ?)",
+                    day_rows
+                )
+
+            if conn.total_changes == changes_before:
+                continue
+            # Late trades for a day that was already rolled up; compaction picks them up after its last trade_id,
+            # and retention keeps the raw file until it has
+            with self.rollup_conn:
+                self.rollup_conn.execute("UPDATE compaction_progress SET is_done = 0 WHERE day = ? AND is_done = 1", (day,))
+
+    def insert_window(self, symbol: str, avg_price: float, cumulative_quantity: float, current_time: float) -> None:
+        conn = self.open_partition(self.day_of(current_time))
+        with conn:
+            conn.execute(
+                f'INSERT INTO {self.table_name} (symbol, avg_price, cumulative_quantity, "current_time") VALUES (?, ?, ?, ?)',
+                (symbol, avg_price, cumulative_quantity, current_time)
+            )
+
+    def query_windows(self, start_time: float, end_time: float) -> list:
+        # Open only the day files the range covers
+        windows = []
+        for day in self.list_partition_days():
+            if not self.day_of(start_time) <= day <= self.day_of(end_time):
+                continue
+            with closing(sqlite3.connect(self.partition_path(day))) as conn:
+                windows.extend(conn.execute(
+                    # Quoted, otherwise SQLite reads current_time as the CURRENT_TIME keyword
+                    f'SELECT symbol, avg_price, cumulative_quantity, "current_time" FROM {self.table_name} '
+                    'WHERE "current_time" >= ? AND "current_time" < ? ORDER BY "current_time"',
+                    (start_time, end_time)
+                ).fetchall())
+        return windows
+
+    def query_bars(self, start_time: float, end_time: float) -> list:
+        return self.rollup_conn.execute(
+            "SELECT symbol, bar_start, open, high, low, close, volume, quote_volume, trade_count FROM bars "
+            "WHERE bar_seconds = ? AND bar_start >= ? AND bar_start < ? ORDER BY bar_start",
+            (self.rollup_seconds, int(start_time), int(end_time))
+        ).fetchall()
+
+    def compact_step(self, today: str, max_rows: int = 50000) -> bool:
+        """Roll up the next batch of trades from the oldest day before `today`; returns False when there is nothing to do."""
+        progress = dict(
+            (day, (last_trade_id, is_done))
+            for day, last_trade_id, is_done in self.rollup_conn.execute("SELECT day, last_trade_id, is_done FROM compaction_progress")
+        )
+
+        for day in self.list_partition_days():
+            # Days from `today` on may still receive trades
+            if day >= today or progress.get(day, (0, 0))[1]:
+                continue
+
+            last_trade_id = progress.get(day, (-1, 0))[0]
+            with closing(sqlite3.connect(self.partition_path(day))) as conn:
+                trade_rows = conn.execute(
+                    f"SELECT trade_id, symbol, price, quantity, trade_time FROM {self.trades_table_name} "
+                    "WHERE trade_id > ? ORDER BY trade_id LIMIT ?",
+                    (last_trade_id, max_rows)
+                ).fetchall()
+
+            is_done = len(trade_rows) < max_rows
+
+            # Bars and progress are committed together, so a crash never counts a batch twice
+            with self.rollup_conn:
+                if trade_rows:
+                    self.merge_bars(trade_rows)
+                    last_trade_id = trade_rows[-1][0]
+                self.rollup_conn.execute(
+                    "INSERT OR REPLACE INTO compaction_progress (day, last_trade_id, is_done) VALUES (?, ?, ?)",
+                    (day, last_trade_id, int(is_done))
+                )
+            if is_done:
+                print(self.PARTITION_COMPACTED_MESSAGE.format(self.partition_path(day).name, self.rollup_seconds))
+            return True
+
+        return False
+
+    def merge_bars(self, trade_rows: list) -> None:
+        # Rows arrive in trade_id order, so the first and last trade of each bar are its open and close
+        bars = {}
+        for trade_id, symbol, price, quantity, trade_time in trade_rows:
+            bar_key = (symbol, int(trade_time) // self.rollup_seconds * self.rollup_seconds)
+            bar = bars.get(bar_key)
+            if bar is None:
+                bars[bar_key] = [price, price, price, price, quantity, price * quantity, 1]
+            else:
+                bar[1] = max(bar[1], price)
+                bar[2] = min(bar[2], price)
+                bar[3] = price
+                bar[4] += quantity
+                bar[5] += price * quantity
+                bar[6] += 1
+
+        # A bar can be split across two batches; merge with what the previous batch stored
+        self.rollup_conn.executemany(
+            """
+            INSERT INTO bars (symbol, bar_seconds, bar_start, open, high, low, close, volume, quote_volume, trade_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, bar_seconds, bar_start) DO UPDATE SET
+                high = max(high, excluded.high),
+                low = min(low, excluded.low),
+                close = excluded.close,
+                volume = volume + excluded.volume,
+                quote_volume = quote_volume + excluded.quote_volume,
+                trade_count = trade_count + excluded.trade_count
+            """,
+            [(symbol, self.rollup_seconds, bar_start, *bar) for (symbol, bar_start), bar in bars.items()]
+        )
+
+    def apply_retention(self, today: str) -> None:
+        today_date = datetime.strptime(today, "%Y%m%d").replace(tzinfo=timezone.utc)
+        compacted_days = {
+            day for (day,) in self.rollup_conn.execute("SELECT day FROM compaction_progress WHERE is_done = 1")
+        }
+
+        if self.raw_retention_days:
+            for day in self.list_partition_days():
+                age_days = (today_date - datetime.strptime(day, "%Y%m%d").replace(tzinfo=timezone.utc)).days
+                # Never drop raw trades that are not in the rollup yet
+                if age_days < self.raw_retention_days or day not in compacted_days:
+                    continue
+                self.drop_partition(day)
+                print(self.PARTITION_DROPPED_MESSAGE.format(self.partition_path(day).name, age_days))
+
+        if self.rollup_retention_days:
+            # Bars are keyed by bar_start, so this is a range delete on the primary key
+            oldest_bar_start = int(today_date.timestamp()) - self.rollup_retention_days * 24 * 60 * 60
+            with self.rollup_conn:
+                self.rollup_conn.execute("DELETE FROM bars WHERE bar_seconds = ? AND bar_start < ?", (self.rollup_seconds, oldest_bar_start))
+
+    def drop_partition(self, day: str) -> None:
+        conn = self.partition_connections.pop(day, None)
+        if conn is not None:
+            conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            partition_file_path = Path(str(self.partition_path(day)) + suffix)
+            if partition_file_path.exists():
+                os.remove(partition_file_path)
+
+    def close(self) -> None:
+        for conn in self.partition_connections.values():
+            conn.close()
+        self.partition_connections = {}
+        self.rollup_conn.close()
+
+class StorageWriter(threading.Thread):
+    """Background writer for PartitionedDatabase.
+
+    Manager hands over each closed window with the trades it contained, so
+    the stream loop never waits on disk. Between batches the same thread
+    runs one bounded compaction step at a time, and retention once per
+    `retention_interval_sec`, so SQLite is only ever used from this thread.
+
+    A day is only compacted once a window that closed on a later day has
+    been written: until then Manager may still hold trades of that day in
+    the open window.
+    """
+
+    STOPPED_MESSAGE = "[INFO] Storage writer stopped; {} trades and {} windows written."
+
+    def __init__(self, database: PartitionedDatabase, idle_interval_sec: float = 1.0, retention_interval_sec: float = 3600.0):
+        super().__init__(name="StorageWriter", daemon=True)
+        self.database = database
+        self.idle_interval_sec = idle_interval_sec
+        self.retention_interval_sec = retention_interval_sec
+        self.batch_queue = queue.SimpleQueue()
+        self.written_trade_count = 0
+        self.written_window_count = 0
+        self.newest_window_day = None # Day of the newest closed window written; earlier days are complete
+
+    def submit(self, trade_rows: list, window_row: tuple = None) -> None:
+        self.batch_queue.put((trade_rows, window_row))
+
+    def stop(self) -> None:
+        self.batch_queue.put(None)
+        self.join()
+
+    def run(self) -> None:
+        next_retention_at = 0.0
+        compaction_pending = True
+
+        while True:
+            # Only block when there is no compaction work left
+            try:
+                batch = self.batch_queue.get(timeout=0 if compaction_pending else self.idle_interval_sec)
+            except queue.Empty:
+                batch = ()
+
+            if batch is None:
+                break
+
+            if batch:
+                trade_rows, window_row = batch
+                if trade_rows:
+                    self.database.insert_trades(trade_rows)
+                    self.written_trade_count += len(trade_rows)
+                if window_row is not None:
+                    self.database.insert_window(*window_row)
+                    self.written_window_count += 1
+                    window_day = PartitionedDatabase.day_of(window_row[3])
+                    if self.newest_window_day is None or window_day > self.newest_window_day:
+                        self.newest_window_day = window_day
+                        compaction_pending = True
+                continue
+
+            if self.newest_window_day is not None:
+                compaction_pending = self.database.compact_step(self.newest_window_day)
+            else:
+                compaction_pending = False
+
+            if time.monotonic() >= next_retention_at:
+                self.database.apply_retention(PartitionedDatabase.day_of(time.time()))
+                next_retention_at = time.monotonic() + self.retention_interval_sec
+                compaction_pending = True
+
+        self.database.close()
+        print(self.STOPPED_MESSAGE.format(self.written_trade_count, self.written_window_count))
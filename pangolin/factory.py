@@ -1,15 +1,32 @@
+from pangolin import constants
+
 class UrlFactory:
     def create_binance_futures_wss_url(self, host: str, ticker: str) -> str:
-        binance_futures_wss_url = "wss://" + host + "/ws/" + ticker + "@aggTrade"
+        binance_futures_wss_url = constants.Schemes.WEBSOCKET + host + "/ws/" + ticker + "@aggTrade"
         print(f"[UrlFactory] WebSocket URL ({binance_futures_wss_url}) has been assembled.")
         return binance_futures_wss_url
 
     def create_binance_futures_price_url(self, host: str, symbol: str) -> str:
-        create_binance_futures_price_url = "https://" + host + "/fapi/v1/ticker/price?symbol=" + symbol
+        create_binance_futures_price_url = constants.Schemes.REST + host + "/fapi/v1/ticker/price?symbol=" + symbol
         print(f"[UrlFactory] Rest API URL ({create_binance_futures_price_url}) has been assembled.")
         return create_binance_futures_price_url
 
     def create_binance_futures_exchange_info_url(self, host: str, symbol: str) -> str:
-        binance_futures_exchange_info_url = "https://" + host + "/fapi/v1/exchangeInfo?symbol=" + symbol
+        binance_futures_exchange_info_url = constants.Schemes.REST + host + "/fapi/v1/exchangeInfo?symbol=" + symbol
         print(f"[UrlFactory] Rest API URL ({binance_futures_exchange_info_url}) has been assembled.")
         return binance_futures_exchange_info_url
+
+    def create_binance_futures_depth_wss_url(self, host: str, ticker: str) -> str:
+        binance_futures_depth_wss_url = constants.Schemes.WEBSOCKET + host + "/ws/" + ticker + "@depth@100ms"
+        print(f"[UrlFactory] WebSocket URL ({binance_futures_depth_wss_url}) has been assembled.")
+        return binance_futures_depth_wss_url
+
+    def create_binance_futures_depth_snapshot_url(self, host: str, symbol: str) -> str:
+        binance_futures_depth_snapshot_url = constants.Schemes.REST + host + "/fapi/v1/depth?symbol=" + symbol + "&limit=1000"
+        print(f"[UrlFactory] Rest API URL ({binance_futures_depth_snapshot_url}) has been assembled.")
+        return binance_futures_depth_snapshot_url
+
+    def create_binance_futures_kline_wss_url(self, host: str, ticker: str, interval: str) -> str:
+        binance_futures_kline_wss_url = constants.Schemes.WEBSOCKET + host + "/ws/" + ticker + "@kline_" + interval
+        print(f"[UrlFactory] WebSocket URL ({binance_futures_kline_wss_url}) has been assembled.")
+        return binance_futures_kline_wss_url
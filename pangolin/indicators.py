@@ -0,0 +1,214 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import math
+from collections import deque
+
+class SimpleMovingAverage:
+    def __init__(self, period: int):
+        self.period = int(period)
+        self.window = deque()
+        self.window_sum = 0.0
+        self.value = None
+
+    def update(self, price: float):
+        self.window.append(price)
+        self.window_sum += price
+
+        # Drop the oldest price once the window is full
+        if len(self.window) > self.period:
+            self.window_sum -= self.window.popleft()
+
+        if len(self.window) == self.period:
+            self.value = self.window_sum / self.period
+
+        return self.value
+
+class ExponentialMovingAverage:
+    def __init__(self, period: int):
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1)
+        self.seed_count = 0
+        self.seed_sum = 0.0
+        self.value = None
+
+    def update(self, price: float):
+        # Seed with the SMA of the first `period` prices, then smooth exponentially
+        if self.value is None:
+            self.seed_count += 1
+            self.seed_sum += price
+            if self.seed_count == self.period:
+                self.value = self.seed_sum / self.period
+            return self.value
+
+        self.value += self.alpha * (price - self.value)
+        return self.value
+
+class RelativeStrengthIndex:
+    def __init__(self, period: int):
+        self.period = int(period)
+        self.last_price = None
+        self.seed_count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = None
+
+    def update(self, price: float):
+        if self.last_price is None:
+            self.last_price = price
+            return self.value
+
+        change = price - self.last_price
+        self.last_price = price
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+
+        # Seed the averages with a plain mean, then apply Wilder's smoothing
+        if self.seed_count < self.period:
+            self.seed_count += 1
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.seed_count < self.period:
+                return self.value
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        if self.avg_loss == 0.0:
+            self.value = 100.0
+        else:
+            relative_strength = self.avg_gain / self.avg_loss
+            self.value = 100.0 - 100.0 / (1.0 + relative_strength)
+
+        return self.value
+
+class RollingVariance:
+    """Sample variance over the last `period` prices using Welford's method."""
+
+    def __init__(self, period: int):
+        self.period = int(period)
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = None
+
+    def update(self, price: float):
+        self.window.append(price)
+
+        if len(self.window) <= self.period:
+            # Growing phase: regular Welford step
+            count = len(self.window)
+            delta = price - self.mean
+            self.mean += delta / count
+            self.m2 += delta * (price - self.mean)
+        else:
+            # Sliding phase: replace the oldest price in a single step
+            oldest_price = self.window.popleft()
+            last_mean = self.mean
+            self.mean += (price - oldest_price) / self.period
+            self.m2 += (price - oldest_price) * (price - self.mean + oldest_price - last_mean)
+
+        # Guard against tiny negative values caused by floating point error
+        self.m2 = max(self.m2, 0.0)
+
+        if len(self.window) == self.period and self.period > 1:
+            self.value = self.m2 / (self.period - 1)
+
+        return self.value
+
+    @property
+    def standard_deviation(self):
+        if self.value is None:
+            return None
+        return math.sqrt(self.value)
+
+class BollingerBands:
+    def __init__(self, period: int, num_std: float = 2.0):
+        self.period = int(period)
+        self.num_std = float(num_std)
+        self.variance = RollingVariance(period=self.period)
+        self.middle = None
+        self.upper = None
+        self.lower = None
+
+    def update(self, price: float):
+        self.variance.update(price)
+
+        if self.variance.value is not None:
+            band_width = self.num_std * self.variance.standard_deviation
+            self.middle = self.variance.mean
+            self.upper = self.middle + band_width
+            self.lower = self.middle - band_width
+
+        return self.middle, self.upper, self.lower
+
+class RollingExtreme:
+    """Rolling min or max over the last `period` prices using a monotonic deque."""
+
+    def __init__(self, period: int, is_max: bool):
+        self.period = int(period)
+        self.is_max = is_max
+        self.candidates = deque() # (index, price) pairs, monotonic by price
+        self.index = 0
+        self.value = None
+
+    def update(self, price: float):
+        # Pop candidates that can never be the extreme again
+        while self.candidates and self.dominates(price, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.index, price))
+
+        # Expire the front candidate once it leaves the window
+        if self.candidates[0][0] <= self.index - self.period:
+            self.candidates.popleft()
+
+        self.index += 1
+        self.value = self.candidates[0][1]
+        return self.value
+
+    def dominates(self, price: float, other_price: float) -> bool:
+        if self.is_max:
+            return price >= other_price
+        return price <= other_price
+
+class RollingMinimum(RollingExtreme):
+    def __init__(self, period: int):
+        super().__init__(period=period, is_max=False)
+
+class RollingMaximum(RollingExtreme):
+    def __init__(self, period: int):
+        super().__init__(period=period, is_max=True)
+
+class Indicators:
+    """Indicator set updated by Manager each time a tumbling window closes."""
+
+    def __init__(self, period: int, bollinger_num_std: float = 2.0):
+        self.period = int(period)
+        self.bollinger_num_std = float(bollinger_num_std)
+        self.reset()
+
+    def reset(self) -> None:
+        self.sma = SimpleMovingAverage(period=self.period)
+        self.ema = ExponentialMovingAverage(period=self.period)
+        self.rsi = RelativeStrengthIndex(period=self.period)
+        self.variance = RollingVariance(period=self.period)
+        self.bollinger = BollingerBands(period=self.period, num_std=self.bollinger_num_std)
+        self.minimum = RollingMinimum(period=self.period)
+        self.maximum = RollingMaximum(period=self.period)
+        self.last_price = None
+        self.update_count = 0
+
+    def update(self, price: float) -> None:
+        self.last_price = price
+        self.update_count += 1
+        self.sma.update(price)
+        self.ema.update(price)
+        self.rsi.update(price)
+        self.variance.update(price)
+        self.bollinger.update(price)
+        self.minimum.update(price)
+        self.maximum.update(price)
+
+    @property
+    def is_ready(self) -> bool:
+        # RSI needs one extra price to produce its first change
+        return self.update_count > self.period
@@ -2,33 +2,38 @@ from pathlib import Path
 from datetime import datetime
 import time
 import json
-from websocket import create_connection # WebSokcetStream
-from websocket import WebSocketTimeoutException # WebSokcetStream
-from contextlib import closing# WebSokcetStream
+import queue
+import threading
+from collections import deque
+from .stream import StreamFeed
 from .strategy import Strategy
+from .strategy import StrategyRegistry
+from .indicators import Indicators
+from .sketch import WindowSketches
 
 from pangolin import constants
 
+# How many recent message ids are remembered to drop duplicates delivered by another connection
+RECENT_ID_COUNT = 10000
+
 class Manager:
     def __init__(
         self,
         client,
         active_urls: list[str],
-        tumbling_window_seconds: int,
-        max_total_loop_count: int,
-        max_display_loop_count: int,
-        connect_timeout_sec: int,
-        recv_timeout_sec: int,
-        max_retry_wait_sec: int,
+        settings,
+        order_book_sync=None,
+        last_price_reference=None,
+        startup=None,
+        market_data_bus=None,
+        exit_trigger_engine=None,
+        storage_writer=None,
     ):
         self.client = client
         self.active_urls = active_urls
-        self.tumbling_window_seconds = int(tumbling_window_seconds) # Parsed from config as str; converted to int
-        self.max_total_loop_count = max_total_loop_count
-        self.max_display_loop_count = max_display_loop_count
-        self.connect_timeout_sec = connect_timeout_sec
-        self.recv_timeout_sec = recv_timeout_sec
-        self.max_retry_wait_sec = max_retry_wait_sec
+
+        # Shared with Client so orders can be priced from the stream instead of a REST call
+        self.last_price_reference = last_price_reference
 
         self.strategy_folder_path = constants.Paths.STRATEGY
         self.response_file_path = constants.Paths.RESPONSE
@@ -38,8 +43,25 @@ class Manager:
         self.cumulative_quantity = 0.0
         self.avg_prices = []
 
-        self.last_trade_id = None
+        # O(1)-update indicators fed with each closed window's average price
+        self.indicators = Indicators(period=settings.indicator_period)
+
+        # Optional per-window price and quantity quantile sketches, fed with every trade
+        self.sketches = None
+        if settings.quantile_sketch_enabled:
+            self.sketches = WindowSketches(k=settings.quantile_sketch_k, history=settings.quantile_sketch_history)
+
+        self.last_trade_id = None # Highest aggTrade id processed so far
+        self.processed_trade_count = 0 # Unique trades processed; ids can have holes after a lost connection
+        self.duplicate_trade_count = 0
+
+        # Connections deliver at their own pace, so a lagging one can still hold trades newer than
+        # the last processed id; duplicates are dropped by id rather than by comparing with the last one
+        self.recent_ids = set()
+        self.recent_id_order = deque()
+        self.evicted_id_floor = None # Highest id no longer remembered; anything at or below it is treated as seen
         self.last_price = None
+        self.last_trade_time = None
         self.last_current_time = time.time()
 
         self.display_loop_count = 0
@@ -49,206 +71,399 @@ class Manager:
             strategy_folder_path=self.strategy_folder_path
         )
 
+        # Every strategy in the folder runs on each trigger, in parallel and isolated from the others
+        self.strategy_registry = StrategyRegistry(
+            strategy=self.strategy
+        )
+
+        # Optional local order book maintained from the depth diff stream
+        self.order_book_sync = order_book_sync
+
+        # Optional shared-memory bus that republishes trades and closed windows to local processes
+        self.market_data_bus = market_data_bus
+        self.closed_window_count = 0
+
+        # Optional client-side TP/SL trigger checked against every trade price
+        self.exit_trigger_engine = exit_trigger_engine
+
+        # Optional day-partitioned storage; trades are buffered per window and written by a background thread
+        self.storage_writer = storage_writer
+        self.storage_trade_rows = []
+
+        # Startup warm-up state; dropped once the first trade has been processed
+        self.startup = startup
+
+        self.stream_feed = None
+
+        # Ingest mode and kline interval are fixed for the lifetime of the process (they are part of the stream URL)
+        self.ingest_mode = settings.ingest_mode
+        self.kline_interval_seconds = settings.kline_interval_seconds
+        if self.ingest_mode == "kline":
+            self.process_message = self.process_binance_kline_message
+        else:
+            self.process_message = self.process_binance_message
+        self.window_kline_count = 0
+
+        # Settings handed over by SettingsReloader; applied by the stream loop between messages
+        self.pending_settings = None
+        self.pending_settings_lock = threading.Lock()
+        self.apply_settings(settings)
+
     @property
     def response_file_exists(self) -> bool:
         return Path(self.response_file_path).is_file()
 
+    def apply_pending_settings(self) -> None:
+        # Take and clear under the lock, so a reload stored in between is not lost
+        with self.pending_settings_lock:
+            settings, self.pending_settings = self.pending_settings, None
+        if settings is not None:
+            self.apply_settings(settings)
+
+    def is_duplicate(self, message_id: int) -> bool:
+        if message_id in self.recent_ids or (self.evicted_id_floor is not None and message_id <= self.evicted_id_floor):
+            return True
+
+        self.recent_ids.add(message_id)
+        self.recent_id_order.append(message_id)
+        if len(self.recent_id_order) > RECENT_ID_COUNT:
+            evicted_id = self.recent_id_order.popleft()
+            self.recent_ids.discard(evicted_id)
+            if self.evicted_id_floor is None or evicted_id > self.evicted_id_floor:
+                self.evicted_id_floor = evicted_id
+        return False
+
+    def request_settings(self, settings) -> None:
+        # Called from another thread; the stream loop only takes the lock once something is pending
+        with self.pending_settings_lock:
+            self.pending_settings = settings
+
+    def apply_settings(self, settings) -> None:
+        self.settings = settings
+        self.tumbling_window_seconds = settings.tumbling_window_seconds
+        self.max_total_loop_count = settings.max_total_loop_count
+        self.max_display_loop_count = settings.max_display_loop_count
+        self.connect_timeout_sec = settings.connect_timeout_sec
+        self.recv_timeout_sec = settings.recv_timeout_sec
+        self.max_retry_wait_sec = settings.max_retry_wait_sec
+        self.klines_per_window = max(1, settings.tumbling_window_seconds // self.kline_interval_seconds)
+
+        # Connection timeouts take effect on each connection's next connect
+        if self.stream_feed is not None:
+            self.stream_feed.connect_timeout_sec = settings.connect_timeout_sec
+            self.stream_feed.recv_timeout_sec = settings.recv_timeout_sec
+            self.stream_feed.max_retry_wait_sec = settings.max_retry_wait_sec
+
+        if self.last_price_reference is not None:
+            self.last_price_reference.max_age_sec = settings.max_price_age_ms / 1000
+
+        self.strategy.refresh_paths()
+
+        # Rebuild indicators for a new period and replay the windows seen so far
+        if self.indicators.period != settings.indicator_period:
+            self.indicators = Indicators(period=settings.indicator_period)
+            for avg_price in self.avg_prices:
+                self.indicators.update(avg_price)
+
     def run_binance_stream(self):
         binance_futures_wss_url = self.active_urls[0] # WebSocket URL
         binance_futures_price_url = self.active_urls[1] # REST URL for current price
         binance_futures_exchange_info_url = self.active_urls[2] # REST URL for exchange metadata
 
-        # Loop control variables
-        retry_count = 0
-        stop_running = False
-
-        while not stop_running:
-            # Main loop to maintain the WebSocket connection
-            #
-            # Exception handling:
-            # - KeyboardInterrupt: gracefully exit the loop if interrupted by the user
-            # - ConnectionError / OSError: handle network-related errors
-            #
-            # Note: WebSocketTimeoutException should be handled only inside the recv()
-            try:
-                with closing(
-                    create_connection(
-                        binance_futures_wss_url, # WebSocketStream URL
-                        timeout=self.connect_timeout_sec # Connection timeout
-                    )
-                ) as ws_conn:
-                    retry_count = 0 # Initialize the retry counter for reconnection attempts
-                    last_recv_time = time.time()  # Get the current time when the connection is created
-                    ws_conn.settimeout(self.recv_timeout_sec) # Set the timeout to the websocket
-
-                    # Emit connection success and startup readiness logs
-                    now_timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    print(f"[INFO] Connected to {binance_futures_wss_url} at {now_timestamp_str} via WebSocket.")
-                    print("[INFO] Everything is ready. WebSocket streaming will be started.\n")
-
-                    while True:
-                        # Raise WebSocketTimeoutException if no message is received within self.recv_timeout_sec
-                        try:
-                            raw_message = ws_conn.recv() # Receive data from the socket
-                            last_recv_time = time.time() # Get the current time when the message is received
-
-                            # Process incoming WebSocket message:
-                            # - Raise ConnectionError if no message received
-                            # - Parse message and skip if empty, invalid, or unexpected format
-                            # - Catch JSON parsing and key/type errors, log warning, and continue
-                            if not raw_message:
-                                raise ConnectionError("[ERROR] Empty message received.") # Raise error if no message was received
-                            try:
-                                # Parse the raw Binance message and valsdate its format
-                                parsed_message = self.extract_binance_message(raw_message)
-                                if parsed_message is None:
-                                    # Skip if message is empty or invalid
-                                    print("[WARN] skipped empty or invalid message")
-                                    continue
-                                if len(parsed_message) != 4:
-                                    # Skip if message format is unexpected
-                                    print(f"[WARN] unexpected message format: {parsed_message}")
-                                    continue
-                                # Unpack the validated message
-                                symbol, price, quantity, timestamp = parsed_message
-                            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as error:
-                                # Handle JSON parsing errors and invalid message formats
-                                print(f"[WARN] parse error: {error}")
-                                continue
-
-                            # Update cumulative statistics with the latest trade data
-                            self.cumulative_count += 1
-                            self.cumulative_price += price
-                            self.cumulative_quantity += quantity
-
-                            # Get the current time in seconds
-                            self.current_time = time.time()
-
-                            # format current time as a readable string
-                            self.current_time_str = datetime.fromtimestamp(self.current_time).strftime('%Y-%m-%d %H:%M:%S')
-
-                            # Check if the defined interval has passed since the last update
-                            if self.current_time - self.last_current_time >= self.tumbling_window_seconds:
-
-                                # No messages received during this window; discard this window
-                                if self.cumulative_count == 0:
-                                    self.last_current_time = self.current_time
-                                    continue
-
-                                # Response file detected; signal to stop streaming
-                                if self.response_file_exists:
-                                    stop_running = True
-                                    break
-
-                                # Increment loop counters
-                                self.display_loop_count += 1
-                                self.total_loop_count += 1
-
-                                # Compute the average price per trade
-                                self.avg_price = self.cumulative_price / self.cumulative_count
-
-                                # Append prices into self.avg_prices
-                                self.avg_prices.append(self.avg_price)
-
-                                # Display current iteration summary
-                                self.display_binance_iteration()
-
-                                if self.total_loop_count % int(self.max_total_loop_count) == 0:
-                                    total_loop_reset_message = (
-                                        "[INFO] Total loop {} reached {}. All will be reset at {}."
-                                    ).format(
-                                        self.total_loop_count,
-                                        self.max_total_loop_count,
-                                        self.current_time_str
-                                    )
-
-                                    print(total_loop_reset_message)
-                                    self.last_current_time = self.current_time
-
-                                    # Reset cumulative statistics for next interval
-                                    self.cumulative_count = 0
-                                    self.cumulative_price = 0.0
-                                    self.cumulative_quantity = 0.0
-
-                                    # Reset loop counters
-                                    self.display_loop_count = 0
-                                    self.total_loop_count = 0
-
-                                    # Reset avg_prices
-                                    self.avg_prices = []
-
-                                    # Go to the next loop
-                                    continue
-
-                                #  Handle actions when display loop count reaches maximum
-                                if self.display_loop_count % int(self.max_display_loop_count) == 0:
-                                    print("=== Triggered ===")
-                                    display_loop_reset_message = "[INFO] Display loop {} reached {}/{}. Reset cumulative values will be reset at {}."
-                                    print(
-                                        display_loop_reset_message.format(
-                                            self.display_loop_count,
-                                            self.max_display_loop_count,
-                                            self.total_loop_count,
-                                            self.current_time_str
-                                        )
-                                    )
-
-                                    strategy = self.strategy.loads(
-                                        avg_prices=self.avg_prices
-                                    )
-
-                                    strategy.execute(
-                                        client=self.client
-                                    )
-
-                                    self.last_current_time = self.current_time
-
-                                    # Reset cumulative statistics for next interval
-                                    self.cumulative_count = 0
-                                    self.cumulative_price = 0.0
-                                    self.cumulative_quantity = 0.0
-
-                                    # Reset loop counter
-                                    self.display_loop_count = 0
-                                    continue
-
-                                # Reset cumulative values related to trades
-                                self.last_current_time = self.current_time
-                                self.cumulative_price = 0.0
-                                self.cumulative_quantity = 0.0
-
-                                # Reset cumulative count related to trades
-                                self.cumulative_count = 0
-
-                        # WebSocketTimeoutException will be raised at socket timeout during read/write data
-                        #
-                        # Note:
-                        # - When the timeout value is reached, WebSocketTimeoutException is triggered by _socket.py's send() and recv() functions
-                        #
-                        # References:
-                        # - https://websocket-client.readthedocs.io/en/latest/examples.html
-                        # - https://websocket-client.readthedocs.io/en/latest/exceptions.html#websocket._exceptions.WebSocketTimeoutException
-                        except WebSocketTimeoutException:
-                            # Compare the current time with last_recv_time, initially set inside `with closing(...) as ws_conn`
-                            if (time.time() - last_recv_time) > self.max_retry_wait_sec:
-                                raise ConnectionError(f"[INFO] No data for {self.max_retry_wait_sec}s")
-                            continue
-
-            # KeyboardInterrupt will be Raised when the user hits the interrupt key (normally Control-C).
-            #
-            # Reference:
-            # - https://docs.python.org/3.13/library/exceptions.html#KeyboardInterrupt
-            except KeyboardInterrupt:
-                print("[INFO] StreamManager interrupted by user.\n")
-                break
-
-            except (ConnectionError, OSError) as e:
-                if stop_running:
+        # Start syncing the local order book alongside the trade stream
+        if self.order_book_sync is not None and not self.order_book_sync.is_alive():
+            self.order_book_sync.start()
+
+        # Connections, reconnects and the 24h rotation are handled by the feed threads;
+        # this loop only consumes messages, so a reconnect never blocks processing
+        self.stream_feed = StreamFeed(
+            wss_url=binance_futures_wss_url,
+            connect_timeout_sec=self.connect_timeout_sec,
+            recv_timeout_sec=self.recv_timeout_sec,
+            max_retry_wait_sec=self.max_retry_wait_sec,
+            standby_enabled=self.settings.standby_connection_enabled,
+            rotate_after_sec=self.settings.rotate_connection_after_sec,
+            initial_socket=self.startup.take_stream_socket() if self.startup is not None else None, # TLS socket pre-connected during warm-up
+        )
+        self.stream_feed.start()
+        print("[INFO] Everything is ready. WebSocket streaming will be started.\n")
+
+        try:
+            while True:
+                try:
+                    raw_message = self.stream_feed.recv(timeout=self.recv_timeout_sec)
+                except queue.Empty:
+                    continue
+
+                if not self.process_message(raw_message):
                     break
-                retry_count += 1
-                wait = min(self.max_retry_wait_sec, BACKOFF_BASE ** retry_count)
-                print(f"[WS ERROR] {e}, retry in {wait}s")
-                time.sleep(wait)
+
+        # KeyboardInterrupt will be Raised when the user hits the interrupt key (normally Control-C).
+        #
+        # Reference:
+        # - https://docs.python.org/3.13/library/exceptions.html#KeyboardInterrupt
+        except KeyboardInterrupt:
+            print("[INFO] StreamManager interrupted by user.\n")
+
+        finally:
+            self.stream_feed.stop()
+            if self.order_book_sync is not None:
+                self.order_book_sync.stop()
+            self.strategy_registry.shutdown(wait=True)
+            self.strategy_registry.display_summary()
+            if self.market_data_bus is not None:
+                self.market_data_bus.close()
+            if self.storage_writer is not None:
+                # Trades of the unfinished window are kept as well
+                self.storage_writer.submit(self.storage_trade_rows)
+                self.storage_trade_rows = []
+                self.storage_writer.stop()
+
+    def process_binance_message(self, raw_message: str) -> bool:
+        # Process incoming WebSocket message:
+        # - Parse message and skip if empty, invalid, or unexpected format
+        # - Catch JSON parsing and key/type errors, log warning, and continue
+        # - Drop trades already seen on another connection (by aggTrade id)
+        #
+        # Returns False when streaming should stop.
+        try:
+            # Parse the raw Binance message and validate its format
+            parsed_message = self.extract_binance_message(raw_message)
+            if parsed_message is None:
+                # Skip if message is empty or invalid
+                print("[WARN] skipped empty or invalid message")
+                return True
+            if len(parsed_message) != 5:
+                # Skip if message format is unexpected
+                print(f"[WARN] unexpected message format: {parsed_message}")
+                return True
+            # Unpack the validated message
+            trade_id, symbol, price, quantity, timestamp = parsed_message
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+            # Handle JSON parsing errors and invalid message formats
+            print(f"[WARN] parse error: {error}")
+            return True
+
+        # Duplicate from the standby connection or a rotation overlap
+        if self.is_duplicate(trade_id):
+            self.duplicate_trade_count += 1
+            return True
+        self.processed_trade_count += 1
+        if self.last_trade_id is None or trade_id > self.last_trade_id:
+            self.last_trade_id = trade_id
+
+        if self.market_data_bus is not None:
+            self.market_data_bus.publish_trade(trade_id, price, quantity, timestamp)
+        if self.storage_writer is not None:
+            self.storage_trade_rows.append((trade_id, symbol, price, quantity, timestamp))
+
+        return self.process_binance_trade(symbol, price, quantity, timestamp)
+
+    def process_binance_trade(self, symbol: str, price: float, quantity: float, timestamp: float) -> bool:
+        if self.startup is not None:
+            self.startup.mark_first_trade()
+            self.startup = None
+
+        # Update cumulative statistics with the latest trade data
+        self.cumulative_count += 1
+        self.cumulative_price += price
+        self.cumulative_quantity += quantity
+        if self.sketches is not None:
+            self.sketches.update(price, quantity)
+
+        # Publish the latest trade for Client order pricing
+        self.last_price = price
+        self.last_trade_time = timestamp
+        if self.last_price_reference is not None:
+            self.last_price_reference.publish(price, timestamp)
+        if self.exit_trigger_engine is not None:
+            self.exit_trigger_engine.on_price(price)
+
+        # Get the current time in seconds; the readable string is only formatted when a window closes
+        self.current_time = time.time()
+
+        # Apply reloaded settings between messages, keeping the connection and window state
+        if self.pending_settings is not None:
+            self.apply_pending_settings()
+
+        # Check if the defined interval has passed since the last update
+        if self.current_time - self.last_current_time >= self.tumbling_window_seconds:
+            return self.close_window()
+
+        return True
+
+    def process_binance_kline_message(self, raw_message: str) -> bool:
+        # Kline ingest mode: Binance pushes the current kline every 250 ms and marks it closed once.
+        # Only closed klines are aggregated; every update still refreshes the last price.
+        try:
+            parsed_message = self.extract_binance_kline_message(raw_message)
+            if parsed_message is None:
+                print("[WARN] skipped empty or invalid message")
+                return True
+            event_time, start_time, close_price, vwap_price, volume, trade_count, is_closed = parsed_message
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+            print(f"[WARN] parse error: {error}")
+            return True
+
+        if self.startup is not None:
+            self.startup.mark_first_trade()
+            self.startup = None
+
+        # Publish the latest close price for Client order pricing
+        self.last_price = close_price
+        self.last_trade_time = event_time
+        if self.last_price_reference is not None:
+            self.last_price_reference.publish(close_price, event_time)
+        if self.exit_trigger_engine is not None:
+            self.exit_trigger_engine.on_price(close_price)
+
+        if not is_closed:
+            return True
+
+        # Duplicate from the standby connection or a rotation overlap
+        if self.is_duplicate(start_time):
+            self.duplicate_trade_count += 1
+            return True
+
+        # Weight each kline's VWAP by its trade count, so avg_price approximates
+        # the per-trade mean computed in aggTrade mode
+        self.cumulative_count += trade_count
+        self.cumulative_price += vwap_price * trade_count
+        self.cumulative_quantity += volume
+        self.window_kline_count += 1
+
+        self.current_time = time.time()
+
+        if self.pending_settings is not None:
+            self.apply_pending_settings()
+
+        # The window closes once it is covered by klines_per_window closed klines
+        if self.window_kline_count >= self.klines_per_window:
+            self.window_kline_count = 0
+            return self.close_window()
+
+        return True
+
+    def close_window(self) -> bool:
+        # No messages received during this window; discard this window
+        if self.cumulative_count == 0:
+            self.last_current_time = self.current_time
+            return True
+
+        # Response file detected; signal to stop streaming, unless the exit trigger
+        # still needs prices for an entry that is filling or a position that is armed
+        is_position_open = self.response_file_exists
+        if is_position_open and (self.exit_trigger_engine is None or not self.exit_trigger_engine.is_active):
+            return False
+
+        # format current time as a readable string
+        self.current_time_str = datetime.fromtimestamp(self.current_time).strftime('%Y-%m-%d %H:%M:%S')
+
+        # Increment loop counters
+        self.display_loop_count += 1
+        self.total_loop_count += 1
+
+        # Compute the average price per trade
+        self.avg_price = self.cumulative_price / self.cumulative_count
+
+        # Append prices into self.avg_prices
+        self.avg_prices.append(self.avg_price)
+
+        # Update indicators with the closed window's average price
+        self.indicators.update(self.avg_price)
+        if self.sketches is not None:
+            self.sketches.close_window()
+
+        self.closed_window_count += 1
+        if self.market_data_bus is not None:
+            self.market_data_bus.publish_window(
+                self.closed_window_count,
+                self.avg_price,
+                self.cumulative_quantity,
+                self.current_time,
+                self.cumulative_count
+            )
+        if self.storage_writer is not None:
+            self.storage_writer.submit(
+                self.storage_trade_rows,
+                (self.settings.active_symbol, self.avg_price, self.cumulative_quantity, self.current_time)
+            )
+            self.storage_trade_rows = []
+
+        # Display current iteration summary
+        self.display_binance_iteration()
+
+        if self.total_loop_count % self.max_total_loop_count == 0:
+            total_loop_reset_message = (
+                "[INFO] Total loop {} reached {}. All will be reset at {}."
+            ).format(
+                self.total_loop_count,
+                self.max_total_loop_count,
+                self.current_time_str
+            )
+
+            print(total_loop_reset_message)
+            self.last_current_time = self.current_time
+
+            # Reset cumulative statistics for next interval
+            self.cumulative_count = 0
+            self.cumulative_price = 0.0
+            self.cumulative_quantity = 0.0
+
+            # Reset loop counters
+            self.display_loop_count = 0
+            self.total_loop_count = 0
+
+            # Reset avg_prices
+            self.avg_prices = []
+            self.indicators.reset()
+            if self.sketches is not None:
+                self.sketches.reset()
+
+            # Go to the next loop
+            return True
+
+        #  Handle actions when display loop count reaches maximum
+        if self.display_loop_count % self.max_display_loop_count == 0:
+            print("=== Triggered ===")
+            display_loop_reset_message = "[INFO] Display loop {} reached {}/{}. Reset cumulative values will be reset at {}."
+            print(
+                display_loop_reset_message.format(
+                    self.display_loop_count,
+                    self.max_display_loop_count,
+                    self.total_loop_count,
+                    self.current_time_str
+                )
+            )
+
+            # No new orders while the exit trigger is managing the open position
+            if not is_position_open:
+                self.strategy_registry.dispatch(
+                    avg_prices=self.avg_prices,
+                    indicators=self.indicators,
+                    client=self.client,
+                    sketches=self.sketches
+                )
+
+            self.last_current_time = self.current_time
+
+            # Reset cumulative statistics for next interval
+            self.cumulative_count = 0
+            self.cumulative_price = 0.0
+            self.cumulative_quantity = 0.0
+
+            # Reset loop counter
+            self.display_loop_count = 0
+            return True
+
+        # Reset cumulative values related to trades
+        self.last_current_time = self.current_time
+        self.cumulative_price = 0.0
+        self.cumulative_quantity = 0.0
+
+        # Reset cumulative count related to trades
+        self.cumulative_count = 0
+        return True
 
     def extract_binance_message(self, message: str):
         try:
@@ -257,19 +472,43 @@ class Manager:
             if json_data.get("e") != "aggTrade":
                 return None
 
+            trade_id = int(json_data["a"])
             symbol = str(json_data["s"])
             price = float(json_data["p"])
             quantity = float(json_data["q"])
             timestamp = int(json_data["T"]) / 1000
 
-            return symbol, price, quantity, timestamp
+            return trade_id, symbol, price, quantity, timestamp
 
         except (json.JSONDecodeError, KeyError, TypeError):
             return None
 
+    def extract_binance_kline_message(self, message: str):
+        json_data = json.loads(message)
+
+        if json_data.get("e") != "kline":
+            return None
+
+        kline = json_data["k"]
+        event_time = int(json_data["E"]) / 1000
+        start_time = int(kline["t"])
+        close_price = float(kline["c"])
+        volume = float(kline["v"]) # Base asset volume
+        quote_volume = float(kline["q"]) # Quote asset volume
+        trade_count = int(kline["n"])
+        is_closed = bool(kline["x"])
+
+        # Volume-weighted average price of the kline; fall back to close when nothing traded
+        vwap_price = quote_volume / volume if volume > 0 else close_price
+
+        return event_time, start_time, close_price, vwap_price, volume, trade_count, is_closed
+
     def display_binance_iteration(self):
         print(f'*** iteration {self.display_loop_count} ***')
         print(f'Received: {self.cumulative_count} messages')
         print(f'Time:     {self.current_time_str}')
         print(f'Price:    {self.cumulative_price:.0f} / {self.cumulative_count} = {self.avg_price:.4f}')
+        if self.sketches is not None and self.sketches.last_price is not None:
+            p05, median, p95 = self.sketches.last_price.quantiles((0.05, 0.5, 0.95))
+            print(f'Median:   {median:.4f} (p05 {p05:.4f} / p95 {p95:.4f})')
         print(f'Quantity: {self.cumulative_quantity:.2f} \n')
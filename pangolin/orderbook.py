@@ -0,0 +1,279 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import closing
+from datetime import datetime
+from decimal import Decimal
+
+import requests
+from websocket import create_connection
+from websocket import WebSocketTimeoutException
+
+class PriceLevels:
+    """One side of the book kept as parallel arrays sorted by ascending price."""
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.prices = []
+        self.quantities = []
+
+    def clear(self) -> None:
+        self.prices = []
+        self.quantities = []
+
+    def set_level(self, price: float, quantity: float) -> None:
+        index = bisect_left(self.prices, price)
+        level_exists = index < len(self.prices) and self.prices[index] == price
+
+        # A zero quantity means the level has to be removed
+        if quantity == 0.0:
+            if level_exists:
+                del self.prices[index]
+                del self.quantities[index]
+        elif level_exists:
+            self.quantities[index] = quantity
+        else:
+            self.prices.insert(index, price)
+            self.quantities.insert(index, quantity)
+
+    def best(self):
+        if not self.prices:
+            return None
+        # Bids: highest price is at the end; asks: lowest price is at the front
+        return self.prices[-1] if self.is_bid else self.prices[0]
+
+    def iterate_from_best(self):
+        if self.is_bid:
+            return zip(reversed(self.prices), reversed(self.quantities))
+        return zip(self.prices, self.quantities)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+class OrderBook:
+    # The depth stream pushes every 100ms; a book that has not moved for this long is not trusted for pricing
+    MAX_EVENT_AGE_SEC = 3.0
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = PriceLevels(is_bid=True)
+        self.asks = PriceLevels(is_bid=False)
+        self.last_update_id = None
+        self.last_event_time = None
+        self.last_applied_monotonic = None # Local receive clock, so exchange clock offset does not matter
+        self.is_synced = False
+        self.lock = threading.Lock()
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        with self.lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, quantity in snapshot["bids"]:
+                self.bids.set_level(float(price), float(quantity))
+            for price, quantity in snapshot["asks"]:
+                self.asks.set_level(float(price), float(quantity))
+            self.last_update_id = int(snapshot["lastUpdateId"])
+            self.is_synced = False
+
+    def apply_diff(self, event: dict) -> None:
+        with self.lock:
+            for price, quantity in event["b"]:
+                self.bids.set_level(float(price), float(quantity))
+            for price, quantity in event["a"]:
+                self.asks.set_level(float(price), float(quantity))
+            self.last_update_id = int(event["u"])
+            self.last_event_time = int(event["E"]) / 1000
+            self.last_applied_monotonic = time.monotonic()
+
+    @property
+    def is_live(self) -> bool:
+        # Synced and still being updated; a depth socket that went silent leaves is_synced set
+        last_applied_monotonic = self.last_applied_monotonic
+        return (
+            self.is_synced
+            and last_applied_monotonic is not None
+            and time.monotonic() - last_applied_monotonic <= self.MAX_EVENT_AGE_SEC
+        )
+
+    def best_bid(self):
+        with self.lock:
+            return self.bids.best()
+
+    def best_ask(self):
+        with self.lock:
+            return self.asks.best()
+
+    def mid_price(self):
+        with self.lock:
+            best_bid = self.bids.best()
+            best_ask = self.asks.best()
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid + best_ask) / 2
+
+    def price_for_quantity(self, side: str, quantity: float):
+        """Return the worst price touched when taking `quantity` from the book, or None if depth is insufficient."""
+        # A BUY order consumes asks, a SELL order consumes bids
+        levels = self.asks if side == "BUY" else self.bids
+        remaining_quantity = quantity
+        with self.lock:
+            for price, level_quantity in levels.iterate_from_best():
+                remaining_quantity -= level_quantity
+                if remaining_quantity <= 0:
+                    return price
+        return None
+
+    def quantity_within(self, side: str, price_limit: float) -> float:
+        """Return the total quantity available on the taking side up to `price_limit`."""
+        levels = self.asks if side == "BUY" else self.bids
+        total_quantity = 0.0
+        with self.lock:
+            for price, level_quantity in levels.iterate_from_best():
+                if (side == "BUY" and price > price_limit) or (side == "SELL" and price < price_limit):
+                    break
+                total_quantity += level_quantity
+        return total_quantity
+
+    def latest_price(self, side: str):
+        # Price the order at the touch on the side it would take from
+        best_price = self.best_ask() if side == "BUY" else self.best_bid()
+        if best_price is None:
+            return None
+        return Decimal(str(best_price))
+
+class OrderBookSync(threading.Thread):
+    """Keep an OrderBook in sync with <symbol>@depth@100ms using a REST snapshot and update ids.
+
+    Reference:
+    - https://developers.binance.com/docs/derivatives/usds-margined-futures/websocket-market-streams/How-to-manage-a-local-order-book-correctly
+    """
+
+    RESYNC_MESSAGE = "[WARN] Order book gap detected (pu={} != {}), resyncing from snapshot."
+    SYNCED_MESSAGE = "[INFO] Order book for {} synced at update id {} ({} bids / {} asks)."
+    SNAPSHOT_RETRY_MESSAGE = "[WARN] Order book snapshot did not line up with the stream, next snapshot in {}s."
+
+    def __init__(
+        self,
+        order_book: OrderBook,
+        depth_wss_url: str,
+        depth_snapshot_url: str,
+        connect_timeout_sec: int,
+        recv_timeout_sec: int,
+        max_retry_wait_sec: int,
+    ):
+        super().__init__(name="OrderBookSync", daemon=True)
+        self.order_book = order_book
+        self.depth_wss_url = depth_wss_url
+        self.depth_snapshot_url = depth_snapshot_url
+        self.connect_timeout_sec = int(connect_timeout_sec)
+        self.recv_timeout_sec = int(recv_timeout_sec)
+        self.max_retry_wait_sec = int(max_retry_wait_sec)
+        self.stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run(self) -> None:
+        retry_count = 0
+        while not self.stop_event.is_set():
+            try:
+                with closing(create_connection(self.depth_wss_url, timeout=self.connect_timeout_sec)) as ws_conn:
+                    ws_conn.settimeout(self.recv_timeout_sec)
+                    now_timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    print(f"[INFO] Connected to {self.depth_wss_url} at {now_timestamp_str} via WebSocket.")
+                    retry_count = 0
+                    self.stream_depth(ws_conn)
+            # KeyError / ValueError: an error body instead of a snapshot, or a malformed frame
+            except (ConnectionError, OSError, requests.RequestException, KeyError, ValueError) as error:
+                self.order_book.is_synced = False
+                retry_count += 1
+                wait = min(self.max_retry_wait_sec, 2 ** retry_count)
+                print(f"[WS ERROR] order book: {error}, retry in {wait}s")
+                self.stop_event.wait(wait)
+
+    def fetch_snapshot(self) -> dict:
+        response = requests.get(self.depth_snapshot_url, timeout=self.connect_timeout_sec)
+        response.raise_for_status()
+        return response.json()
+
+    def stream_depth(self, ws_conn) -> None:
+        buffered_events = []
+        snapshot_loaded = False
+        last_recv_time = time.time()
+
+        # A snapshot that does not line up is retried with a growing delay, so a lagging
+        # REST endpoint is not hit once per event (the depth snapshot has a heavy request weight)
+        snapshot_wait_sec = 0
+        next_snapshot_at = 0.0
+
+        while not self.stop_event.is_set():
+            try:
+                raw_message = ws_conn.recv()
+            except WebSocketTimeoutException:
+                if (time.time() - last_recv_time) > self.max_retry_wait_sec:
+                    raise ConnectionError(f"[INFO] No depth data for {self.max_retry_wait_sec}s")
+                continue
+
+            if not raw_message:
+                raise ConnectionError("[ERROR] Empty depth message received.")
+            last_recv_time = time.time()
+
+            event = json.loads(raw_message)
+            if event.get("e") != "depthUpdate":
+                continue
+
+            # Buffer events until the snapshot is in place
+            if not snapshot_loaded:
+                buffered_events.append(event)
+                if time.monotonic() < next_snapshot_at:
+                    continue
+                self.order_book.load_snapshot(self.fetch_snapshot())
+                snapshot_loaded = True
+                pending_events = buffered_events
+                buffered_events = []
+            else:
+                pending_events = (event,)
+
+            for index, pending_event in enumerate(pending_events):
+                if not self.apply_event(pending_event):
+                    # Gap in the update id chain; start over from a fresh snapshot, keeping the unapplied events
+                    snapshot_loaded = False
+                    buffered_events = list(pending_events[index:])
+                    if snapshot_wait_sec:
+                        print(self.SNAPSHOT_RETRY_MESSAGE.format(snapshot_wait_sec))
+                    next_snapshot_at = time.monotonic() + snapshot_wait_sec
+                    snapshot_wait_sec = min(self.max_retry_wait_sec, max(1, snapshot_wait_sec * 2))
+                    break
+            else:
+                if self.order_book.is_synced:
+                    snapshot_wait_sec = 0
+
+    def apply_event(self, event: dict) -> bool:
+        order_book = self.order_book
+        first_update_id = int(event["U"])
+        final_update_id = int(event["u"])
+
+        # Drop events that are already covered by the snapshot
+        if final_update_id < order_book.last_update_id:
+            return True
+
+        if not order_book.is_synced:
+            # The first applied event must straddle the snapshot's lastUpdateId
+            if first_update_id > order_book.last_update_id:
+                return False
+            order_book.apply_diff(event)
+            order_book.is_synced = True
+            print(self.SYNCED_MESSAGE.format(order_book.symbol, order_book.last_update_id, len(order_book.bids), len(order_book.asks)))
+            return True
+
+        # Every following event has to continue the previous one
+        if int(event["pu"]) != order_book.last_update_id:
+            print(self.RESYNC_MESSAGE.format(event["pu"], order_book.last_update_id))
+            order_book.is_synced = False
+            return False
+
+        order_book.apply_diff(event)
+        return True
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import time
+from decimal import Decimal
+
+class LastPrice:
+    """Last trade price published by the stream and read by Client for order pricing.
+
+    The price, trade time and local receive time are swapped in as one tuple,
+    so a reader on another thread never sees a half-updated reference.
+    """
+
+    def __init__(self, max_age_ms: int = 500):
+        self.max_age_sec = int(max_age_ms) / 1000
+        self.snapshot = None # (price, trade_time, recv_monotonic)
+
+    def publish(self, price: float, trade_time: float) -> None:
+        self.snapshot = (price, trade_time, time.monotonic())
+
+    @property
+    def price(self):
+        snapshot = self.snapshot
+        return None if snapshot is None else snapshot[0]
+
+    @property
+    def trade_time(self):
+        snapshot = self.snapshot
+        return None if snapshot is None else snapshot[1]
+
+    @property
+    def age_sec(self):
+        # Measured on the local monotonic clock so exchange clock offset does not matter
+        snapshot = self.snapshot
+        return None if snapshot is None else time.monotonic() - snapshot[2]
+
+    def fresh_price(self):
+        """Return the last price as a Decimal, or None if it is missing or older than max_age_ms."""
+        snapshot = self.snapshot
+        if snapshot is None or (time.monotonic() - snapshot[2]) > self.max_age_sec:
+            return None
+        return Decimal(str(snapshot[0]))
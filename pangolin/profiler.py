@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+class SamplingProfiler(threading.Thread):
+    """Low-overhead statistical profiler for the running process.
+
+    Every `interval_ms` the call stack of each thread (stream loop, feed
+    connections, order book, strategy and client calls) is captured with
+    sys._current_frames(). Stacks are aggregated in memory and written every
+    `flush_interval_sec` as:
+    - collapsed stacks ("thread;frame;frame count"), the input format of
+      flamegraph.pl, speedscope and inferno
+    - per-function self and total sample counts
+
+    SIGUSR1 pauses or resumes sampling so a profile can cover just the period of interest.
+    """
+
+    FLUSH_MESSAGE = "[Profiler] {} samples written to {} and {}."
+    TOGGLE_MESSAGE = "[Profiler] Sampling {}."
+
+    def __init__(self, output_folder_path: Path, interval_ms: int = 10, flush_interval_sec: int = 60, enabled: bool = True):
+        super().__init__(name="SamplingProfiler", daemon=True)
+        self.output_folder_path = Path(output_folder_path)
+        self.collapsed_file_path = self.output_folder_path / "profile.collapsed"
+        self.functions_file_path = self.output_folder_path / "profile_functions.txt"
+        self.interval_sec = int(interval_ms) / 1000
+        self.flush_interval_sec = int(flush_interval_sec)
+
+        self.stack_counts = Counter()
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.sample_count = 0
+        self.frame_labels = {} # code object -> label, so each code object is formatted once
+
+        self.sampling_event = threading.Event()
+        if enabled:
+            self.sampling_event.set()
+        self.stop_event = threading.Event()
+
+    def install_signal_handler(self) -> None:
+        # signal.signal() is only allowed from the main thread
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle())
+
+    def toggle(self) -> None:
+        if self.sampling_event.is_set():
+            self.sampling_event.clear()
+            print(self.TOGGLE_MESSAGE.format("paused"))
+        else:
+            self.sampling_event.set()
+            print(self.TOGGLE_MESSAGE.format("resumed"))
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        own_thread_id = threading.get_ident()
+        next_flush_time = time.monotonic() + self.flush_interval_sec
+
+        while not self.stop_event.wait(self.interval_sec):
+            if self.sampling_event.is_set():
+                self.take_sample(own_thread_id)
+
+            if time.monotonic() >= next_flush_time:
+                self.flush()
+                next_flush_time = time.monotonic() + self.flush_interval_sec
+
+        self.flush()
+
+    def take_sample(self, own_thread_id: int) -> None:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+
+            # Walk from the innermost frame outwards
+            labels = []
+            while frame is not None:
+                labels.append(self.label_for(frame.f_code))
+                frame = frame.f_back
+            if not labels:
+                continue
+            labels.reverse()
+
+            thread_name = thread_names.get(thread_id, str(thread_id))
+            self.stack_counts[thread_name + ";" + ";".join(labels)] += 1
+            self.self_counts[labels[-1]] += 1
+            for label in set(labels):
+                self.total_counts[label] += 1
+
+        self.sample_count += 1
+
+    def label_for(self, code) -> str:
+        label = self.frame_labels.get(code)
+        if label is None:
+            qualified_name = getattr(code, "co_qualname", code.co_name)
+            label = f"{Path(code.co_filename).stem}.{qualified_name}:{code.co_firstlineno}"
+            self.frame_labels[code] = label
+        return label
+
+    def flush(self) -> None:
+        if not self.sample_count:
+            return
+
+        self.output_folder_path.mkdir(parents=True, exist_ok=True)
+
+        with open(self.collapsed_file_path, "w", encoding="utf-8") as collapsed_file:
+            for stack, count in self.stack_counts.most_common():
+                collapsed_file.write(f"{stack} {count}\n")
+
+        with open(self.functions_file_path, "w", encoding="utf-8") as functions_file:
+            functions_file.write(f"# {self.sample_count} samples every {self.interval_sec * 1000:.0f} ms\n")
+            functions_file.write(f"{'self':>8}  {'self%':>6}  {'total':>8}  {'total%':>6}  function\n")
+            total_samples = sum(self.self_counts.values())
+            for label, total_count in self.total_counts.most_common():
+                self_count = self.self_counts.get(label, 0)
+                functions_file.write(
+                    f"{self_count:>8}  {self_count / total_samples:>6.1%}  "
+                    f"{total_count:>8}  {total_count / total_samples:>6.1%}  {label}\n"
+                )
+
+        print(self.FLUSH_MESSAGE.format(self.sample_count, self.collapsed_file_path, self.functions_file_path))
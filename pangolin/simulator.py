@@ -0,0 +1,400 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import base64
+import hashlib
+import json
+import queue
+import random
+import socketserver
+import struct
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+class ExchangeSimulator:
+    """Local stand-in for the Binance futures stream and REST API.
+
+    A single generator thread produces synthetic aggTrade frames at `rate`
+    messages/sec and broadcasts the same frames to every connected client,
+    so a standby connection sees the same aggTrade ids. Bursts, gaps and
+    forced disconnects are drawn at random per second of stream time.
+
+    The same trades are also rolled up into klines of `kline_interval_ms`,
+    pushed every 250 ms and once more when closed, like <symbol>@kline_<interval>.
+    """
+
+    def __init__(
+        self,
+        symbol: str = "BTCUSDT",
+        rate: float = 1000.0,
+        start_price: float = 100000.0,
+        burst_rate: float = 0.0,
+        burst_multiplier: float = 10.0,
+        burst_sec: float = 1.0,
+        gap_rate: float = 0.0,
+        gap_sec: float = 3.0,
+        disconnect_mean_sec: float = 0.0,
+        kline_interval_ms: int = 60_000,
+    ):
+        self.symbol = symbol
+        self.rate = float(rate)
+        self.price = float(start_price)
+        self.burst_rate = float(burst_rate) # bursts per second
+        self.burst_multiplier = float(burst_multiplier)
+        self.burst_sec = float(burst_sec)
+        self.gap_rate = float(gap_rate) # gaps per second
+        self.gap_sec = float(gap_sec)
+        self.disconnect_mean_sec = float(disconnect_mean_sec) # 0 disables forced disconnects
+        self.kline_interval_ms = int(kline_interval_ms)
+
+        self.trade_id = 0
+        self.order_id = 0
+        self.orders = {} # order id -> order, for status queries
+        self.subscribers = set()
+        self.kline_subscribers = set()
+        self.subscribers_lock = threading.Lock()
+        self.kline = None
+        self.stop_event = threading.Event()
+
+    def subscribe(self, kline: bool = False) -> queue.SimpleQueue:
+        subscriber = queue.SimpleQueue()
+        with self.subscribers_lock:
+            (self.kline_subscribers if kline else self.subscribers).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.SimpleQueue) -> None:
+        with self.subscribers_lock:
+            self.subscribers.discard(subscriber)
+            self.kline_subscribers.discard(subscriber)
+
+    def broadcast(self, subscribers: set, batch: bytes) -> None:
+        with self.subscribers_lock:
+            subscribers = list(subscribers)
+        for subscriber in subscribers:
+            subscriber.put(batch)
+
+    def update_kline(self, trade_time_ms: int, price: float, quantity: float) -> None:
+        start_time = trade_time_ms // self.kline_interval_ms * self.kline_interval_ms
+        kline = self.kline
+        if kline is not None and kline["t"] != start_time:
+            self.push_kline(trade_time_ms, is_closed=True)
+            kline = None
+        if kline is None:
+            kline = self.kline = {
+                "t": start_time, "T": start_time + self.kline_interval_ms - 1,
+                "o": price, "h": price, "l": price, "c": price, "v": 0.0, "q": 0.0, "n": 0,
+            }
+        kline["h"] = max(kline["h"], price)
+        kline["l"] = min(kline["l"], price)
+        kline["c"] = price
+        kline["v"] += quantity
+        kline["q"] += price * quantity
+        kline["n"] += 1
+
+    def push_kline(self, event_time_ms: int, is_closed: bool = False) -> None:
+        kline = self.kline
+        if kline is None:
+            return
+        self.broadcast(self.kline_subscribers, encode_text_frame(json.dumps({
+            "e": "kline",
+            "E": event_time_ms,
+            "s": self.symbol,
+            "k": {
+                "t": kline["t"],
+                "T": kline["T"],
+                "s": self.symbol,
+                "i": format_kline_interval(self.kline_interval_ms),
+                "o": f"{kline['o']:.2f}",
+                "c": f"{kline['c']:.2f}",
+                "h": f"{kline['h']:.2f}",
+                "l": f"{kline['l']:.2f}",
+                "v": f"{kline['v']:.3f}",
+                "n": kline["n"],
+                "x": is_closed,
+                "q": f"{kline['q']:.5f}",
+            },
+        })))
+
+    def connection_lifetime_sec(self):
+        if self.disconnect_mean_sec <= 0:
+            return None
+        return random.expovariate(1.0 / self.disconnect_mean_sec)
+
+    def run_generator(self, tick_sec: float = 0.001) -> None:
+        last_time = time.monotonic()
+        credit = 0.0
+        burst_until = 0.0
+        gap_until = 0.0
+        next_kline_push = 0.0
+
+        while not self.stop_event.is_set():
+            time.sleep(tick_sec)
+            now = time.monotonic()
+            elapsed = now - last_time
+            last_time = now
+
+            if now >= next_kline_push:
+                self.push_kline(int(time.time() * 1000))
+                next_kline_push = now + 0.25
+
+            # Decide on bursts and gaps as Poisson events
+            if now >= burst_until and random.random() < self.burst_rate * elapsed:
+                burst_until = now + self.burst_sec
+            if now >= gap_until and random.random() < self.gap_rate * elapsed:
+                gap_until = now + self.gap_sec
+
+            if now < gap_until:
+                credit = 0.0
+                continue
+
+            current_rate = self.rate * (self.burst_multiplier if now < burst_until else 1.0)
+            credit += elapsed * current_rate
+            frame_count = int(credit)
+            if frame_count == 0:
+                continue
+            credit -= frame_count
+
+            # Encode the batch once and hand the same bytes to every subscriber
+            frames = bytearray()
+            trade_time_ms = int(time.time() * 1000)
+            for _ in range(frame_count):
+                self.trade_id += 1
+                self.price = max(0.01, self.price * (1.0 + random.gauss(0.0, 0.00005)))
+                price = round(self.price, 2)
+                quantity = round(random.uniform(0.001, 2.0), 3)
+                self.update_kline(trade_time_ms, price, quantity)
+                frames += encode_text_frame(json.dumps({
+                    "e": "aggTrade",
+                    "E": trade_time_ms,
+                    "a": self.trade_id,
+                    "s": self.symbol,
+                    "p": f"{price:.2f}",
+                    "q": f"{quantity:.3f}",
+                    "f": self.trade_id,
+                    "l": self.trade_id,
+                    "T": trade_time_ms,
+                    "m": random.random() < 0.5,
+                }))
+
+            self.broadcast(self.subscribers, bytes(frames))
+
+    def create_order(self, params: dict) -> dict:
+        self.order_id += 1
+        order = self.orders[self.order_id] = {
+            "orderId": self.order_id,
+            "symbol": params.get("symbol", self.symbol),
+            "status": "NEW",
+            "clientOrderId": f"sim-{self.order_id}",
+            "price": params.get("price", f"{self.price:.2f}"),
+            "origQty": params.get("quantity", "0"),
+            "executedQty": "0",
+            "timeInForce": params.get("timeInForce", "GTC"),
+            "type": params.get("type", "LIMIT"),
+            "side": params.get("side", "BUY"),
+            "updateTime": int(time.time() * 1000),
+        }
+        return order
+
+    def query_order(self, order_id: int) -> dict:
+        # Every order fills as soon as it is queried
+        order = self.orders.get(order_id, {"orderId": order_id, "symbol": self.symbol, "origQty": "0"})
+        order.update(status="FILLED", executedQty=order["origQty"])
+        return order
+
+def format_kline_interval(interval_ms: int) -> str:
+    # Largest unit that divides the interval evenly, as in 1d, 4h, 15m or 5s
+    interval_sec = interval_ms // 1000
+    for unit, unit_sec in (("d", 24 * 60 * 60), ("h", 60 * 60), ("m", 60)):
+        if interval_sec % unit_sec == 0:
+            return f"{interval_sec // unit_sec}{unit}"
+    return f"{interval_sec}s"
+
+def encode_text_frame(payload: str) -> bytes:
+    # Server-to-client frames are not masked (RFC 6455, section 5.1)
+    data = payload.encode("utf-8")
+    length = len(data)
+    if length < 126:
+        header = struct.pack("!BB", 0x81, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x81, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, length)
+    return header + data
+
+class StreamRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        simulator = self.server.simulator
+
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+
+        request_line, *header_lines = request.split(b"\r\n\r\n", 1)[0].decode("latin-1").split("\r\n")
+        headers = {}
+        for header_line in header_lines:
+            name, _, value = header_line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        path = request_line.split(" ")[1]
+        is_kline_stream = "@kline_" in path
+        if not (is_kline_stream or "@aggTrade" in path) or "sec-websocket-key" not in headers:
+            self.request.sendall(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            return
+
+        accept_key = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode("ascii")).digest()
+        ).decode("ascii")
+        self.request.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key}\r\n\r\n"
+        ).encode("ascii"))
+
+        lifetime_sec = simulator.connection_lifetime_sec()
+        disconnect_at = None if lifetime_sec is None else time.monotonic() + lifetime_sec
+
+        subscriber = simulator.subscribe(kline=is_kline_stream)
+        try:
+            while not simulator.stop_event.is_set():
+                if disconnect_at is not None and time.monotonic() >= disconnect_at:
+                    # Drop the TCP connection without a close frame, like a network failure
+                    return
+                try:
+                    batch = subscriber.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                self.request.sendall(batch)
+        except OSError:
+            return
+        finally:
+            simulator.unsubscribe(subscriber)
+
+class RestRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+    def log_message(self, format, *args) -> None:
+        pass # Keep the soak output readable
+
+    def send_json(self, json_data: dict, status_code: int = 200) -> None:
+        body = json.dumps(json_data).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        simulator = self.server.simulator
+        parsed_url = urllib.parse.urlparse(self.path)
+        params = dict(urllib.parse.parse_qsl(parsed_url.query))
+
+        if parsed_url.path == "/fapi/v1/time":
+            self.send_json({"serverTime": int(time.time() * 1000)})
+        elif parsed_url.path == "/fapi/v1/ticker/price":
+            self.send_json({"symbol": simulator.symbol, "price": f"{simulator.price:.2f}", "time": int(time.time() * 1000)})
+        elif parsed_url.path == "/fapi/v1/exchangeInfo":
+            self.send_json({"symbols": [{
+                "symbol": simulator.symbol,
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "tickSize": "0.10"},
+                    {"filterType": "LOT_SIZE", "stepSize": "0.001"},
+                ],
+            }]})
+        elif parsed_url.path == "/fapi/v1/order":
+            self.send_json(simulator.query_order(int(params.get("orderId", 0))))
+        elif parsed_url.path == "/fapi/v1/depth":
+            self.send_json({"lastUpdateId": 0, "bids": [], "asks": []})
+        elif parsed_url.path == "/sim/stats":
+            with simulator.subscribers_lock:
+                connection_count = len(simulator.subscribers)
+            self.send_json({"sent": simulator.trade_id, "rate": simulator.rate, "connections": connection_count})
+        else:
+            self.send_json({"code": -1, "msg": "not found"}, status_code=404)
+
+    def do_DELETE(self) -> None:
+        simulator = self.server.simulator
+        parsed_url = urllib.parse.urlparse(self.path)
+        params = dict(urllib.parse.parse_qsl(parsed_url.query))
+
+        if parsed_url.path == "/fapi/v1/order":
+            self.send_json({"symbol": simulator.symbol, "clientOrderId": params.get("origClientOrderId"), "status": "CANCELED"})
+        else:
+            self.send_json({"code": -1, "msg": "not found"}, status_code=404)
+
+    def do_POST(self) -> None:
+        simulator = self.server.simulator
+        parsed_url = urllib.parse.urlparse(self.path)
+        content_length = int(self.headers.get("Content-Length", 0))
+        params = dict(urllib.parse.parse_qsl(self.rfile.read(content_length).decode("utf-8")))
+        params.update(urllib.parse.parse_qsl(parsed_url.query))
+
+        if parsed_url.path == "/fapi/v1/order":
+            self.send_json(simulator.create_order(params))
+        elif parsed_url.path == "/sim/rate":
+            simulator.rate = float(params["value"])
+            self.send_json({"rate": simulator.rate})
+        else:
+            self.send_json({"code": -1, "msg": "not found"}, status_code=404)
+
+class ThreadingStreamServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(simulator: ExchangeSimulator, host: str, stream_port: int, api_port: int):
+    stream_server = ThreadingStreamServer((host, stream_port), StreamRequestHandler)
+    stream_server.simulator = simulator
+    api_server = ThreadingHTTPServer((host, api_port), RestRequestHandler)
+    api_server.daemon_threads = True
+    api_server.simulator = simulator
+
+    for target in (simulator.run_generator, stream_server.serve_forever, api_server.serve_forever):
+        threading.Thread(target=target, daemon=True).start()
+
+    return stream_server, api_server
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m pangolin.simulator", description="Local Binance futures stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--stream-port", type=int, default=8765)
+    parser.add_argument("--api-port", type=int, default=8766)
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--rate", type=float, default=1000.0, help="aggTrade messages per second")
+    parser.add_argument("--burst-rate", type=float, default=0.0, help="bursts per second")
+    parser.add_argument("--burst-multiplier", type=float, default=10.0)
+    parser.add_argument("--burst-sec", type=float, default=1.0)
+    parser.add_argument("--gap-rate", type=float, default=0.0, help="silent gaps per second")
+    parser.add_argument("--gap-sec", type=float, default=3.0)
+    parser.add_argument("--disconnect-mean-sec", type=float, default=0.0, help="mean connection lifetime; 0 disables")
+    parser.add_argument("--kline-interval-sec", type=int, default=60, help="kline length for @kline_ subscribers")
+    args = parser.parse_args()
+
+    simulator = ExchangeSimulator(
+        symbol=args.symbol,
+        rate=args.rate,
+        burst_rate=args.burst_rate,
+        burst_multiplier=args.burst_multiplier,
+        burst_sec=args.burst_sec,
+        gap_rate=args.gap_rate,
+        gap_sec=args.gap_sec,
+        disconnect_mean_sec=args.disconnect_mean_sec,
+        kline_interval_ms=args.kline_interval_sec * 1000,
+    )
+    serve(simulator, args.host, args.stream_port, args.api_port)
+    print(f"[Simulator] stream ws://{args.host}:{args.stream_port}, api http://{args.host}:{args.api_port}, {args.rate:.0f} msg/s")
+
+    try:
+        simulator.stop_event.wait()
+    except KeyboardInterrupt:
+        simulator.stop_event.set()
+
+if __name__ == '__main__':
+    main()
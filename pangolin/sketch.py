@@ -0,0 +1,202 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import math
+import random
+from array import array
+from collections import deque
+
+class KllSketch:
+    """Mergeable streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Items are appended to level 0. When a level outgrows its capacity it is
+    sorted and every other item (random offset) moves up one level with
+    twice the weight. Capacities shrink geometrically by `c` towards the
+    lower levels, so memory stays around k / (1 - c) values no matter how
+    many items were added, and the rank error is roughly 1.7 / k.
+    Levels are arrays of doubles: about 5 KB at k = 200.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3):
+        self.k = int(k)
+        self.c = float(c)
+        self.levels = [array("d")]
+        self.size = 0
+        self.max_size = 0
+        self.count = 0
+        self.min_value = math.inf
+        self.max_value = -math.inf
+        self.update_max_size()
+
+    def capacity(self, height: int) -> int:
+        depth = len(self.levels) - height - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def update_max_size(self) -> None:
+        self.max_size = sum(self.capacity(height) for height in range(len(self.levels)))
+
+    def update(self, value: float) -> None:
+        self.levels[0].append(value)
+        self.size += 1
+        self.count += 1
+        if value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+        if self.size >= self.max_size:
+            self.compress()
+
+    def compress(self) -> None:
+        for height, level in enumerate(self.levels):
+            if len(level) < self.capacity(height):
+                continue
+
+            if height + 1 >= len(self.levels):
+                self.levels.append(array("d"))
+                self.update_max_size()
+
+            sorted_values = sorted(level)
+            # An odd item out stays on this level
+            kept_values = sorted_values[-1:] if len(sorted_values) % 2 else []
+            paired_values = sorted_values[:len(sorted_values) - len(kept_values)]
+            self.levels[height + 1].extend(paired_values[random.getrandbits(1)::2])
+            self.levels[height] = array("d", kept_values)
+
+            self.size = sum(len(level) for level in self.levels)
+            # Lazy compaction: one level per call is enough to get back under max_size
+            if self.size < self.max_size:
+                return
+
+    def merge(self, other: "KllSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(array("d"))
+        self.update_max_size()
+
+        for height, level in enumerate(other.levels):
+            self.levels[height].extend(level)
+        self.count += other.count
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self.size = sum(len(level) for level in self.levels)
+
+        while self.size >= self.max_size:
+            self.compress()
+
+    def copy(self) -> "KllSketch":
+        sketch_copy = KllSketch.__new__(KllSketch)
+        sketch_copy.__dict__.update(self.__dict__)
+        sketch_copy.levels = [array("d", level) for level in self.levels]
+        return sketch_copy
+
+    def weighted_values(self) -> list:
+        weighted_values = []
+        for height, level in enumerate(self.levels):
+            weight = 1 << height
+            weighted_values.extend((value, weight) for value in level)
+        weighted_values.sort()
+        return weighted_values
+
+    def quantile(self, q: float):
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs) -> list:
+        """Values at each rank fraction in `qs`; None while the sketch is empty."""
+        if self.count == 0:
+            return [None for _ in qs]
+
+        weighted_values = self.weighted_values()
+        total_weight = sum(weight for _, weight in weighted_values)
+        results = []
+        for q in qs:
+            if q <= 0.0:
+                results.append(self.min_value)
+                continue
+            if q >= 1.0:
+                results.append(self.max_value)
+                continue
+
+            target_weight = q * total_weight
+            cumulative_weight = 0
+            for value, weight in weighted_values:
+                cumulative_weight += weight
+                if cumulative_weight >= target_weight:
+                    results.append(value)
+                    break
+            else:
+                results.append(self.max_value)
+        return results
+
+    def rank(self, value: float) -> float:
+        """Fraction of items less than or equal to `value`."""
+        if self.count == 0:
+            return 0.0
+        weighted_values = self.weighted_values()
+        total_weight = sum(weight for _, weight in weighted_values)
+        return sum(weight for item, weight in weighted_values if item <= value) / total_weight
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(level.itemsize * len(level) for level in self.levels)
+
+class WindowSketches:
+    """Per-window price and quantity sketches, with the last `history` closed windows kept for merging.
+
+    Manager feeds every trade into the current window and calls
+    close_window() when the tumbling window closes. Strategies read the
+    closed windows and can merge any number of them into a longer horizon.
+    """
+
+    def __init__(self, k: int = 200, history: int = 60):
+        self.k = int(k)
+        self.history = int(history)
+        self.reset()
+
+    def reset(self) -> None:
+        self.price = KllSketch(k=self.k)
+        self.quantity = KllSketch(k=self.k)
+        self.closed_windows = deque(maxlen=self.history) # (price sketch, quantity sketch), oldest first
+
+    def update(self, price: float, quantity: float) -> None:
+        self.price.update(price)
+        self.quantity.update(quantity)
+
+    def snapshot(self) -> "WindowSketches":
+        # Copies of the closed windows for one strategy; much cheaper than copy.deepcopy()
+        window_sketches = WindowSketches(k=self.k, history=self.history)
+        window_sketches.closed_windows.extend(
+            (price_sketch.copy(), quantity_sketch.copy()) for price_sketch, quantity_sketch in self.closed_windows
+        )
+        return window_sketches
+
+    def close_window(self) -> None:
+        self.closed_windows.append((self.price, self.quantity))
+        self.price = KllSketch(k=self.k)
+        self.quantity = KllSketch(k=self.k)
+
+    @property
+    def last_price(self):
+        return self.closed_windows[-1][0] if self.closed_windows else None
+
+    @property
+    def last_quantity(self):
+        return self.closed_windows[-1][1] if self.closed_windows else None
+
+    def merged_price(self, window_count: int = None) -> KllSketch:
+        return self.merge_closed(0, window_count)
+
+    def merged_quantity(self, window_count: int = None) -> KllSketch:
+        return self.merge_closed(1, window_count)
+
+    def merge_closed(self, index: int, window_count: int = None) -> KllSketch:
+        # The most recent `window_count` windows, or all kept windows
+        windows = list(self.closed_windows)
+        if window_count is not None:
+            windows = windows[-window_count:]
+
+        merged_sketch = KllSketch(k=self.k)
+        for window in windows:
+            merged_sketch.merge(window[index])
+        return merged_sketch
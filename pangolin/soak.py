@@ -0,0 +1,241 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import _thread
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from pangolin import constants
+
+SOAK_CONFIG_TEMPLATE = """[Binance]
+is_enabled = yes
+is_testnet = no
+supported_coin = btc
+api_key = soak-api-key
+api_secret = soak-api-secret
+tumbling_window_seconds = {tumbling_window_seconds}
+max_total_loop_count = {max_total_loop_count}
+max_display_loop_count = {max_display_loop_count}
+connect_timeout_sec = 5
+recv_timeout_sec = 1
+max_retry_wait_sec = 10
+standby_connection_enabled = {standby_connection_enabled}
+"""
+
+def point_constants_at(stream_host: str, api_host: str, data_folder_path: Path) -> None:
+    """Redirect the real entry point to the local simulator and a scratch data folder."""
+    constants.Schemes.WEBSOCKET = "ws://"
+    constants.Schemes.REST = "http://"
+    constants.Hosts.BINANCE_FUTURES_STREAM = stream_host
+    constants.Hosts.BINANCE_FUTURES_API = api_host
+    constants.Hosts.BINANCE_TESTNET_FUTURES_API = api_host
+
+    # Urls are assembled at import time, so rebuild them from the patched hosts
+    constants.Urls.BINANCE_FUTURES_TIME = constants.Schemes.REST + api_host + constants.Endpoints.BINANCE_FUTURES_TIME
+    constants.Urls.BINANCE_TESTNET_FUTURES_TIME = constants.Urls.BINANCE_FUTURES_TIME
+    constants.Urls.BINANCE_FUTURES_ORDER = constants.Schemes.REST + api_host + constants.Endpoints.BINANCE_FUTURES_ORDER
+    constants.Urls.BINANCE_TESTNET_FUTURES_ORDER = constants.Urls.BINANCE_FUTURES_ORDER
+
+    # Keep soak output away from the real response file
+    constants.Paths.DATA = data_folder_path
+    constants.Paths.RESPONSE = data_folder_path / constants.FileNames.RESPONSE
+
+def read_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def wait_for_port(host: str, port: int, timeout_sec: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise ConnectionError(f"[ERROR] Simulator did not open {host}:{port} within {timeout_sec}s")
+
+class SoakMonitor(threading.Thread):
+    """Sample throughput, lag and memory of the running Manager and write them to CSV."""
+
+    CSV_HEADER = "elapsed_sec,sent,processed,duplicates,msgs_per_sec,backlog_msgs,lag_ms,queue_size,rss_mb,sim_rate\n"
+    REPORT_MESSAGE = "[Soak] {:>7.0f}s  {:>9.0f} msg/s  backlog {:>7}  lag {:>8.1f} ms  queue {:>6}  rss {:>7.1f} MB  target {:>7.0f}/s"
+
+    def __init__(self, api_base_url: str, csv_path: Path, report_interval_sec: float, duration_sec: float, ramp_step: float, ramp_interval_sec: float):
+        super().__init__(name="SoakMonitor", daemon=True)
+        self.api_base_url = api_base_url
+        self.csv_path = csv_path
+        self.report_interval_sec = report_interval_sec
+        self.duration_sec = duration_sec
+        self.ramp_step = ramp_step
+        self.ramp_interval_sec = ramp_interval_sec
+        self.manager = None
+        self.manager_ready_event = threading.Event()
+        self.rows = []
+
+    def attach(self, manager) -> None:
+        self.manager = manager
+        self.manager_ready_event.set()
+
+    def fetch_simulator_stats(self) -> dict:
+        with urllib.request.urlopen(self.api_base_url + "/sim/stats", timeout=5) as response:
+            return json.load(response)
+
+    def set_simulator_rate(self, rate: float) -> None:
+        request = urllib.request.Request(self.api_base_url + f"/sim/rate?value={rate}", data=b"", method="POST")
+        urllib.request.urlopen(request, timeout=5).close()
+
+    def run(self) -> None:
+        self.manager_ready_event.wait()
+        started_at = time.monotonic()
+        next_ramp_at = started_at + self.ramp_interval_sec
+        last_processed = 0
+        last_sample_at = started_at
+
+        with open(self.csv_path, "w", encoding="utf-8") as csv_file:
+            csv_file.write(self.CSV_HEADER)
+
+            while True:
+                time.sleep(self.report_interval_sec)
+                now = time.monotonic()
+                manager = self.manager
+
+                # Count unique trades rather than reading the last id, so trades lost in a disconnect or a failover
+                # show up as backlog. Read it before the simulator stats so the backlog is never negative.
+                processed = manager.processed_trade_count
+                simulator_stats = self.fetch_simulator_stats()
+                msgs_per_sec = (processed - last_processed) / (now - last_sample_at)
+                last_processed, last_sample_at = processed, now
+
+                lag_ms = (time.time() - manager.last_trade_time) * 1000 if manager.last_trade_time else 0.0
+                queue_size = manager.stream_feed.message_queue.qsize() if manager.stream_feed is not None else 0
+
+                row = {
+                    "elapsed_sec": now - started_at,
+                    "sent": simulator_stats["sent"],
+                    "processed": processed,
+                    "duplicates": manager.duplicate_trade_count,
+                    "msgs_per_sec": msgs_per_sec,
+                    "backlog_msgs": simulator_stats["sent"] - processed,
+                    "lag_ms": lag_ms,
+                    "queue_size": queue_size,
+                    "rss_mb": read_rss_bytes() / 1024 / 1024,
+                    "sim_rate": simulator_stats["rate"],
+                }
+                self.rows.append(row)
+                csv_file.write(",".join(f"{value:.3f}" if isinstance(value, float) else str(value) for value in row.values()) + "\n")
+                csv_file.flush()
+
+                print(self.REPORT_MESSAGE.format(
+                    row["elapsed_sec"], msgs_per_sec, row["backlog_msgs"], lag_ms, queue_size, row["rss_mb"], row["sim_rate"]
+                ))
+
+                if self.ramp_step and now >= next_ramp_at:
+                    self.set_simulator_rate(simulator_stats["rate"] + self.ramp_step)
+                    next_ramp_at = now + self.ramp_interval_sec
+
+                if now - started_at >= self.duration_sec:
+                    # Stop the stream loop the same way Control-C does
+                    _thread.interrupt_main()
+                    return
+
+    def display_summary(self) -> None:
+        if not self.rows:
+            print("[Soak] No samples collected.")
+            return
+
+        # Sustained rate: windows where the consumer kept up (backlog not growing past one report interval)
+        sustained_rates = [row["msgs_per_sec"] for row in self.rows if row["backlog_msgs"] <= row["sim_rate"] * self.report_interval_sec]
+        print("=== Soak Summary ===")
+        print(f"[Soak] duration:            {self.rows[-1]['elapsed_sec']:.0f}s")
+        print(f"[Soak] processed / sent:    {self.rows[-1]['processed']} / {self.rows[-1]['sent']}")
+        print(f"[Soak] duplicates dropped:  {self.rows[-1]['duplicates']}")
+        print(f"[Soak] peak msg/s:          {max(row['msgs_per_sec'] for row in self.rows):.0f}")
+        print(f"[Soak] max sustained msg/s: {max(sustained_rates) if sustained_rates else 0.0:.0f}")
+        print(f"[Soak] max lag:             {max(row['lag_ms'] for row in self.rows):.1f} ms")
+        print(f"[Soak] rss start/end/peak:  {self.rows[0]['rss_mb']:.1f} / {self.rows[-1]['rss_mb']:.1f} / {max(row['rss_mb'] for row in self.rows):.1f} MB")
+        print(f"[Soak] samples written to {self.csv_path}")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m pangolin.soak", description="Soak-test Pangolin against the local simulator")
+    parser.add_argument("--duration-sec", type=float, default=3600.0)
+    parser.add_argument("--report-interval-sec", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=1000.0, help="initial aggTrade messages per second")
+    parser.add_argument("--ramp-step", type=float, default=0.0, help="raise the rate by this much every ramp interval")
+    parser.add_argument("--ramp-interval-sec", type=float, default=60.0)
+    parser.add_argument("--burst-rate", type=float, default=0.0)
+    parser.add_argument("--gap-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-mean-sec", type=float, default=0.0)
+    parser.add_argument("--standby", action="store_true", help="enable the standby connection")
+    parser.add_argument("--with-strategies", action="store_true", help="trigger strategies as configured instead of only aggregating windows")
+    parser.add_argument("--stream-port", type=int, default=8765)
+    parser.add_argument("--api-port", type=int, default=8766)
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    soak_folder_path = Path(tempfile.mkdtemp(prefix="pangolin-soak-"))
+    config_path = soak_folder_path / constants.FileNames.CONFIG
+    config_path.write_text(SOAK_CONFIG_TEMPLATE.format(
+        tumbling_window_seconds=10,
+        max_total_loop_count=360 if args.with_strategies else 10 ** 9,
+        max_display_loop_count=6 if args.with_strategies else 10 ** 9,
+        standby_connection_enabled="yes" if args.standby else "no",
+    ), encoding="utf-8")
+
+    # Run the simulator in its own process so it does not compete for our GIL
+    simulator_process = subprocess.Popen([
+        sys.executable, "-m", "pangolin.simulator",
+        "--host", host,
+        "--stream-port", str(args.stream_port),
+        "--api-port", str(args.api_port),
+        "--rate", str(args.rate),
+        "--burst-rate", str(args.burst_rate),
+        "--gap-rate", str(args.gap_rate),
+        "--disconnect-mean-sec", str(args.disconnect_mean_sec),
+    ])
+
+    try:
+        wait_for_port(host, args.stream_port)
+        wait_for_port(host, args.api_port)
+
+        point_constants_at(
+            stream_host=f"{host}:{args.stream_port}",
+            api_host=f"{host}:{args.api_port}",
+            data_folder_path=soak_folder_path,
+        )
+
+        monitor = SoakMonitor(
+            api_base_url=f"http://{host}:{args.api_port}",
+            csv_path=soak_folder_path / "soak.csv",
+            report_interval_sec=args.report_interval_sec,
+            duration_sec=args.duration_sec,
+            ramp_step=args.ramp_step,
+            ramp_interval_sec=args.ramp_interval_sec,
+        )
+        monitor.start()
+
+        # Drive the real entry point
+        from pangolin.__main__ import main as pangolin_main
+        sys.argv = [sys.argv[0], "--config", str(config_path)]
+        pangolin_main(on_manager_ready=monitor.attach)
+
+        monitor.display_summary()
+
+    finally:
+        simulator_process.terminate()
+        simulator_process.wait()
+
+if __name__ == '__main__':
+    main()
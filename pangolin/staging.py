@@ -0,0 +1,332 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import argparse
+import collections
+import hashlib
+import hmac
+import json
+import math
+import selectors
+import socket
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+import urllib.parse
+from decimal import Decimal
+from pathlib import Path
+
+class OrderTemplate:
+    """Pre-validated, pre-quantized order with the HMAC state of its fixed fields.
+
+    Everything except the price and the timestamp is encoded at arm time. The
+    HMAC-SHA256 over the fixed part of the body is computed once as well, so
+    render() only formats the price, copies that HMAC state, absorbs the
+    remaining few bytes and assembles the request.
+    """
+
+    VALID_SIDES = ("BUY", "SELL")
+    VALID_TYPES = ("LIMIT", "MARKET")
+
+    def __init__(
+        self,
+        name: str,
+        symbol: str,
+        side: str,
+        trade_type: str,
+        time_in_force: str,
+        quantity: Decimal,
+        leverage: int,
+        tick_size: Decimal,
+        api_key: str,
+        api_secret: str,
+        order_url: str,
+    ):
+        if side not in self.VALID_SIDES:
+            raise ValueError(f"[ERROR] Order intent {name}: side must be BUY or SELL, got {side!r}.")
+        if trade_type not in self.VALID_TYPES:
+            raise ValueError(f"[ERROR] Order intent {name}: type must be LIMIT or MARKET, got {trade_type!r}.")
+        if quantity <= 0:
+            raise ValueError(f"[ERROR] Order intent {name}: quantity rounds down to zero at the lot step size.")
+
+        self.name = name
+        self.side = side
+        self.trade_type = trade_type
+        self.quantity = quantity
+        self.is_limit = trade_type == "LIMIT"
+
+        # Prices are rounded down to the tick size, as in Client.calculate_binance_futures_order_price()
+        self.tick_size = float(tick_size)
+        self.price_decimals = max(0, -tick_size.normalize().as_tuple().exponent)
+
+        fixed_parameters = {"symbol": symbol, "side": side, "type": trade_type}
+        if self.is_limit:
+            fixed_parameters["timeInForce"] = time_in_force
+        fixed_parameters["quantity"] = str(quantity)
+        fixed_parameters["leverage"] = leverage
+        self.body_prefix = urllib.parse.urlencode(fixed_parameters) + ("&price=" if self.is_limit else "")
+        self.body_prefix_hmac = hmac.new(api_secret.encode("utf-8"), self.body_prefix.encode("ascii"), hashlib.sha256)
+
+        parsed_url = urllib.parse.urlparse(order_url)
+        self.request_head = (
+            f"POST {parsed_url.path} HTTP/1.1\r\n"
+            f"Host: {parsed_url.netloc}\r\n"
+            f"X-MBX-APIKEY: {api_key}\r\n"
+            "Content-Type: application/x-www-form-urlencoded\r\n"
+            "Connection: keep-alive\r\n"
+            "Content-Length: "
+        )
+
+    def format_price(self, price: float) -> str:
+        tick_count = math.floor(price / self.tick_size + 1e-9)
+        return f"{tick_count * self.tick_size:.{self.price_decimals}f}"
+
+    def render(self, price: float, timestamp_ms: int) -> bytes:
+        body_suffix = (self.format_price(price) if self.is_limit else "") + "&timestamp=" + str(timestamp_ms)
+
+        signature_hmac = self.body_prefix_hmac.copy()
+        signature_hmac.update(body_suffix.encode("ascii"))
+        body = self.body_prefix + body_suffix + "&signature=" + signature_hmac.hexdigest()
+
+        return (self.request_head + str(len(body)) + "\r\n\r\n" + body).encode("ascii")
+
+class WarmOrderConnection(threading.Thread):
+    """Keep-alive HTTP connection to the order endpoint that is already open when a trigger fires.
+
+    send() writes a finished request straight to the socket and returns; this
+    thread reads the responses in order and hands them to each request's
+    callback. Reads block without a timeout, so a slow response is never cut
+    in half; idleness is detected with a selector while nothing is in
+    flight, and then a cheap GET goes out every `keepalive_interval_sec` so
+    neither side closes the connection. It reconnects as soon as the
+    exchange drops it.
+    """
+
+    CONNECTED_MESSAGE = "[INFO] Order connection to {} is warm ({:.1f} ms)."
+    RECONNECT_MESSAGE = "[WARN] Order connection lost ({}); reconnecting."
+
+    def __init__(self, order_url: str, keepalive_path: str, connect_timeout_sec: int = 10, keepalive_interval_sec: float = 30.0):
+        super().__init__(name="OrderConnection", daemon=True)
+        parsed_url = urllib.parse.urlparse(order_url)
+        self.use_tls = parsed_url.scheme == "https"
+        self.host = parsed_url.hostname
+        self.port = parsed_url.port or (443 if self.use_tls else 80)
+        self.connect_timeout_sec = connect_timeout_sec
+        self.keepalive_interval_sec = keepalive_interval_sec
+        self.keepalive_request = (
+            f"GET {keepalive_path} HTTP/1.1\r\nHost: {parsed_url.netloc}\r\nConnection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+
+        self.sock = None
+        self.response_file = None
+        self.selector = None
+        self.write_lock = threading.Lock()
+        self.pending_callbacks = collections.deque() # One entry per request in flight, in send order
+        self.connected_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.trigger_to_wire_us = collections.deque(maxlen=10000)
+
+    def connect(self) -> None:
+        connect_started_at = time.perf_counter()
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout_sec)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if self.use_tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        # Blocking reads: a socket file object refuses every read after its first timeout
+        sock.settimeout(None)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(sock, selectors.EVENT_READ)
+        self.sock = sock
+        self.response_file = sock.makefile("rb")
+        self.connected_event.set()
+        print(self.CONNECTED_MESSAGE.format(self.host, (time.perf_counter() - connect_started_at) * 1000))
+
+    def send(self, request: bytes, on_response=None, fired_at: float = None) -> None:
+        # A connection the exchange closed while idle is only noticed here; resend once on the new one
+        for attempt in range(2):
+            # Waits only if the connection is being re-established
+            self.connected_event.wait(self.connect_timeout_sec)
+            with self.write_lock:
+                sock = self.sock
+                try:
+                    if sock is None:
+                        raise ConnectionError("order connection is not open")
+                    self.pending_callbacks.append(on_response)
+                    sock.sendall(request)
+                    break
+                except OSError:
+                    if sock is not None:
+                        self.pending_callbacks.pop()
+                    if attempt == 1:
+                        raise
+                    self.connected_event.clear()
+            if sock is not None:
+                self.shutdown_socket(sock)
+
+        if fired_at is not None:
+            self.trigger_to_wire_us.append((time.perf_counter() - fired_at) * 1e6)
+
+    def shutdown_socket(self, sock) -> None:
+        # Wakes the reader thread, which then reconnects
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                if self.sock is None:
+                    self.connect()
+                self.read_responses()
+            except (OSError, ConnectionError, ValueError) as error:
+                if self.stop_event.is_set():
+                    break
+                print(self.RECONNECT_MESSAGE.format(error))
+                self.close_socket()
+                self.stop_event.wait(0.1)
+
+    def close_socket(self) -> None:
+        self.connected_event.clear()
+        with self.write_lock:
+            if self.sock is not None:
+                try:
+                    self.sock.close()
+                except OSError:
+                    pass
+            if self.selector is not None:
+                self.selector.close()
+            self.sock = None
+            self.response_file = None
+            self.selector = None
+            # Requests that were in flight will not get an answer on a new connection
+            for on_response in self.pending_callbacks:
+                if on_response is not None:
+                    on_response(None, b"")
+            self.pending_callbacks.clear()
+
+    def read_responses(self) -> None:
+        while not self.stop_event.is_set():
+            # Nothing in flight means nothing is buffered either; wait for the socket instead of
+            # reading with a timeout. Decrypted TLS bytes can be pending without the socket being readable.
+            if not self.pending_callbacks and not (self.use_tls and self.sock.pending()):
+                if not self.selector.select(self.keepalive_interval_sec):
+                    # Idle: keep the connection warm
+                    with self.write_lock:
+                        self.pending_callbacks.append(None)
+                        self.sock.sendall(self.keepalive_request)
+                    continue
+
+            status_code, body = self.read_response()
+
+            on_response = self.pending_callbacks.popleft() if self.pending_callbacks else None
+            if on_response is not None:
+                on_response(status_code, body)
+
+    def read_response(self):
+        status_line = self.response_file.readline()
+        if not status_line:
+            raise ConnectionError("closed by peer")
+        status_code = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            header_line = self.response_file.readline()
+            if header_line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header_line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                chunk_size = int(self.response_file.readline().split(b";")[0], 16)
+                if chunk_size == 0:
+                    self.response_file.readline()
+                    break
+                body += self.response_file.read(chunk_size)
+                self.response_file.readline()
+        else:
+            body = self.response_file.read(int(headers.get("content-length", 0)))
+
+        if headers.get("connection", "").lower() == "close":
+            raise ConnectionError("server asked to close")
+        return status_code, body
+
+def main():
+    # Imported here because Client itself imports this module
+    from pangolin import constants
+    from pangolin.client import Client
+    from pangolin.price import LastPrice
+    from pangolin.soak import point_constants_at
+
+    parser = argparse.ArgumentParser(prog="python -m pangolin.staging", description="Benchmark trigger-to-wire time of staged orders against the local simulator")
+    parser.add_argument("--api", default="127.0.0.1:8766", help="HOST:PORT of a running pangolin.simulator REST API")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--interval-ms", type=float, default=2.0, help="pause between fires")
+    args = parser.parse_args()
+
+    point_constants_at(stream_host=args.api, api_host=args.api, data_folder_path=Path(tempfile.mkdtemp(prefix="pangolin-staging-")))
+
+    api_base_url = constants.Schemes.REST + args.api
+    last_price_reference = LastPrice(max_age_ms=10 ** 9)
+    client = Client(
+        active_urls=[None, api_base_url + "/fapi/v1/ticker/price", api_base_url + "/fapi/v1/exchangeInfo", constants.Urls.BINANCE_FUTURES_TIME, constants.Urls.BINANCE_FUTURES_ORDER],
+        active_symbol="BTCUSDT",
+        active_api_key="benchmark-api-key",
+        active_api_secret="benchmark-api-secret",
+        last_price_reference=last_price_reference,
+    )
+    client.load_binance_futures_symbol_filters()
+    client.sample_binance_server_time_offset()
+    last_price_reference.publish(100000.0, time.time())
+
+    # Unstaged: everything binance_place_order does before it can send
+    build_times_us = []
+    for _ in range(args.iterations):
+        build_started_at = time.perf_counter()
+        client.side = "BUY"
+        client.amount_usdt = 1000
+        client.leverage = 1
+        client.calculate_binance_futures_order_price()
+        order_json_data = client.create_binance_futures_order_json(
+            symbol=client.active_symbol, side="BUY", trade_type="LIMIT", time_in_force="GTC",
+            price=client.binance_futures_order_price, quantity=client.binance_futures_order_quantity,
+            leverage=1, timestamp=client.retrieve_binance_server_time(),
+        )
+        client.sign_binance_params(json.loads(order_json_data))
+        build_times_us.append((time.perf_counter() - build_started_at) * 1e6)
+
+    # Staged: arm once per fire, then measure from fire() to the last byte handed to the kernel
+    for iteration in range(args.iterations):
+        client.arm_order_intent(name="benchmark", side="BUY", trade_type="LIMIT", time_in_force="GTC", amount_usdt=1000, leverage=1)
+        client.fire_order_intent(name="benchmark", price=100000.0 + iteration % 100)
+        time.sleep(args.interval_ms / 1000)
+
+    trigger_to_wire_us = sorted(client.order_connection.trigger_to_wire_us)
+    client.order_connection.stop()
+
+    def percentile(values, fraction):
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+    build_times_us.sort()
+    print("=== Trigger-to-wire (us) ===")
+    print(f"{'path':<28} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for label, values in (("unstaged build + sign only", build_times_us), ("staged fire to wire", trigger_to_wire_us)):
+        print(f"{label:<28} {percentile(values, 0.5):>8.1f} {percentile(values, 0.9):>8.1f} {percentile(values, 0.99):>8.1f} {values[-1]:>8.1f}")
+    print(f"[INFO] staged mean {statistics.fmean(trigger_to_wire_us):.1f} us over {len(trigger_to_wire_us)} fires; "
+          f"{sum(1 for value in trigger_to_wire_us if value >= 1000)} at or above 1 ms.")
+
+if __name__ == '__main__':
+    main()
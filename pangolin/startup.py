@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import socket
+import ssl
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+class Startup:
+    """Run startup warm-up steps in parallel and report how long the way to the first trade took."""
+
+    TASK_DONE_MESSAGE = "[Startup] {:<20} {:>8.1f} ms"
+    TASK_FAILED_MESSAGE = "[WARN] Startup task {} failed after {:.1f} ms: {}"
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timings = {} # task name -> milliseconds
+        self.warmup_finished_at = None
+        self.first_trade_at = None
+        self.stream_socket = None
+
+    def run_warmup(self, client, strategy, stream_url: str, connect_timeout_sec: int) -> None:
+        warmup_tasks = {
+            "stream pre-connect": lambda: self.preconnect_stream(stream_url, connect_timeout_sec),
+            "exchangeInfo": client.load_binance_futures_symbol_filters,
+            "clock offset": client.sample_binance_server_time_offset,
+            "strategy compile": strategy.preload,
+        }
+
+        with ThreadPoolExecutor(max_workers=len(warmup_tasks), thread_name_prefix="Startup") as executor:
+            futures = {
+                task_name: executor.submit(self.run_timed, task_name, task)
+                for task_name, task in warmup_tasks.items()
+            }
+            for future in futures.values():
+                future.result()
+
+        self.warmup_finished_at = time.perf_counter()
+
+        if client.binance_futures_server_time_offset_ms is not None:
+            print(f"[Startup] server clock offset: {client.binance_futures_server_time_offset_ms} ms")
+        print(self.TASK_DONE_MESSAGE.format("warm-up (wall)", (self.warmup_finished_at - self.started_at) * 1000))
+
+    def run_timed(self, task_name: str, task) -> None:
+        task_started_at = time.perf_counter()
+        try:
+            task()
+        except Exception as error:
+            # Warm-up is best effort; every step has a lazy fallback at first use
+            elapsed_ms = (time.perf_counter() - task_started_at) * 1000
+            print(self.TASK_FAILED_MESSAGE.format(task_name, elapsed_ms, error))
+            return
+
+        self.timings[task_name] = (time.perf_counter() - task_started_at) * 1000
+        print(self.TASK_DONE_MESSAGE.format(task_name, self.timings[task_name]))
+
+    def preconnect_stream(self, stream_url: str, connect_timeout_sec: int) -> None:
+        # DNS, TCP and TLS done up front; Manager only has to send the websocket upgrade
+        parsed_url = urllib.parse.urlparse(stream_url)
+        use_tls = parsed_url.scheme == "wss"
+        stream_host = parsed_url.hostname
+        port = parsed_url.port or (443 if use_tls else 80)
+
+        dns_started_at = time.perf_counter()
+        address_info = socket.getaddrinfo(stream_host, port, type=socket.SOCK_STREAM)
+        self.timings["stream dns"] = (time.perf_counter() - dns_started_at) * 1000
+
+        family, socket_type, proto, _, socket_address = address_info[0]
+        raw_socket = socket.socket(family, socket_type, proto)
+        raw_socket.settimeout(int(connect_timeout_sec))
+        raw_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        raw_socket.connect(socket_address)
+
+        if use_tls:
+            raw_socket = ssl.create_default_context().wrap_socket(raw_socket, server_hostname=stream_host)
+        self.stream_socket = raw_socket
+
+    def take_stream_socket(self):
+        # The pre-connected socket can only be used for the first connection
+        stream_socket = self.stream_socket
+        self.stream_socket = None
+        return stream_socket
+
+    def mark_first_trade(self) -> None:
+        self.first_trade_at = time.perf_counter()
+        self.display_report()
+
+    def display_report(self) -> None:
+        print("=== Startup Timing ===")
+        for task_name, elapsed_ms in self.timings.items():
+            print(self.TASK_DONE_MESSAGE.format(task_name, elapsed_ms))
+        if self.warmup_finished_at is not None:
+            print(self.TASK_DONE_MESSAGE.format("warm-up (wall)", (self.warmup_finished_at - self.started_at) * 1000))
+            print(self.TASK_DONE_MESSAGE.format("warm-up to 1st trade", (self.first_trade_at - self.warmup_finished_at) * 1000))
+        print(self.TASK_DONE_MESSAGE.format("time to 1st trade", (self.first_trade_at - self.started_at) * 1000) + "\n")
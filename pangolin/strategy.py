@@ -1,32 +1,154 @@
 from pathlib import Path
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
+import copy
 import importlib.util
+import inspect
 import sys
+import threading
+import time
+import traceback
 
 class Strategy:
     def __init__(self, strategy_folder_path: str):
         self.strategy_folder_path = Path(strategy_folder_path)
         self.strategy_paths = list(self.strategy_folder_path.glob('*.py'))
+        self.strategy_class_cache = {} # path -> (mtime_ns, strategy_class)
+        self.import_lock = threading.Lock() # Strategies may be loaded from several worker threads
 
-    def loads(self, avg_prices: List[float]):
-        file_name = self.strategy_paths[0].stem # The final path component, without its suffix
-        module_name = file_name.replace("_", " ").title().replace(" ", "") # Convert snake case to pascal case
+    def refresh_paths(self) -> None:
+        # Pick up strategy files added to or removed from the folder
+        self.strategy_paths = list(self.strategy_folder_path.glob('*.py'))
+
+    def preload(self) -> None:
+        # Import and cache every strategy class ahead of the first trigger
+        for strategy_path in self.strategy_paths:
+            module_name = strategy_path.stem.replace("_", " ").title().replace(" ", "")
+            self.get_cached_strategy_class(module_name=module_name, strategy_path=strategy_path)
 
-        # Dynamically load the strategy class from the strategy file
-        strategy_class = self.get_strategy_class_from_file(
-            module_name=module_name
+    def loads(self, avg_prices: List[float], indicators=None, sketches=None):
+        return self.load_instance(
+            strategy_path=self.strategy_paths[0],
+            avg_prices=avg_prices,
+            indicators=indicators,
+            sketches=sketches
         )
 
-        print(f"[INFO] Strategy loaded successfully (Class: {module_name}, File: {file_name}.py)")
+    def load_instance(self, strategy_path: Path, avg_prices: List[float], indicators=None, sketches=None):
+        file_name = strategy_path.stem # The final path component, without its suffix
+        module_name = file_name.replace("_", " ").title().replace(" ", "") # Convert snake case to pascal case
 
-        return strategy_class(
-            avg_prices=avg_prices
+        # Dynamically load the strategy class, re-importing only when the file has changed
+        strategy_class = self.get_cached_strategy_class(
+            module_name=module_name,
+            strategy_path=strategy_path
         )
 
-    def get_strategy_class_from_file(self, module_name: str):
-        spec = importlib.util.spec_from_file_location(module_name, self.strategy_paths[0])
+        # Hand over the indicator set and quantile sketches only to strategies that declare those arguments
+        strategy_kwargs = {"avg_prices": avg_prices}
+        strategy_parameters = inspect.signature(strategy_class).parameters
+        if "indicators" in strategy_parameters:
+            strategy_kwargs["indicators"] = indicators
+        if "sketches" in strategy_parameters:
+            strategy_kwargs["sketches"] = sketches
+
+        return strategy_class(**strategy_kwargs)
+
+    def get_cached_strategy_class(self, module_name: str, strategy_path: Path):
+        mtime_ns = strategy_path.stat().st_mtime_ns
+        cached_entry = self.strategy_class_cache.get(strategy_path)
+        if cached_entry is not None and cached_entry[0] == mtime_ns:
+            return cached_entry[1]
+
+        with self.import_lock:
+            strategy_class = self.get_strategy_class_from_file(module_name=module_name, strategy_path=strategy_path)
+            self.strategy_class_cache[strategy_path] = (mtime_ns, strategy_class)
+        print(f"[INFO] Strategy loaded successfully (Class: {module_name}, File: {strategy_path.name})")
+        return strategy_class
+
+    def get_strategy_class_from_file(self, module_name: str, strategy_path: Path = None):
+        if strategy_path is None:
+            strategy_path = self.strategy_paths[0]
+
+        spec = importlib.util.spec_from_file_location(module_name, strategy_path)
         module = importlib.util.module_from_spec(spec)
         sys.modules[module_name] = module
         spec.loader.exec_module(module)
         strategy_class = getattr(module, module_name)
         return strategy_class
+
+class StrategyRegistry:
+    """Run every strategy in the strategies folder on the same feed.
+
+    Each trigger is fanned out to all strategies on a thread pool. Every
+    strategy gets its own copy of the window history and indicators, so one
+    strategy cannot change what another sees, and an exception in one is
+    logged and counted without affecting the others or the stream loop.
+    A strategy that is still running from the previous trigger is skipped
+    rather than queued, so a slow strategy never builds up a backlog.
+    """
+
+    SKIPPED_MESSAGE = "[WARN] Strategy {} is still running from the previous trigger; skipped."
+    FAILED_MESSAGE = "[ERROR] Strategy {} failed ({} failures so far): {}"
+    NO_STRATEGY_MESSAGE = "[WARN] No strategy files found in {}."
+
+    def __init__(self, strategy: Strategy, max_workers: int = None):
+        self.strategy = strategy
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Strategy")
+        self.running_futures = {} # path -> Future of the latest run
+        self.run_counts = {}
+        self.failure_counts = {}
+        self.last_durations = {}
+
+    def dispatch(self, avg_prices: List[float], indicators, client, sketches=None) -> None:
+        if not self.strategy.strategy_paths:
+            print(self.NO_STRATEGY_MESSAGE.format(self.strategy.strategy_folder_path))
+            return
+
+        # Freeze the shared inputs once; each strategy still gets its own copy below
+        avg_prices_snapshot = tuple(avg_prices)
+
+        for strategy_path in self.strategy.strategy_paths:
+            running_future = self.running_futures.get(strategy_path)
+            if running_future is not None and not running_future.done():
+                print(self.SKIPPED_MESSAGE.format(strategy_path.name))
+                continue
+
+            self.running_futures[strategy_path] = self.executor.submit(
+                self.run_strategy,
+                strategy_path,
+                list(avg_prices_snapshot),
+                copy.deepcopy(indicators),
+                client,
+                sketches.snapshot() if sketches is not None else None
+            )
+
+    def run_strategy(self, strategy_path: Path, avg_prices: List[float], indicators, client, sketches=None) -> None:
+        started_at = time.perf_counter()
+        try:
+            strategy_instance = self.strategy.load_instance(
+                strategy_path=strategy_path,
+                avg_prices=avg_prices,
+                indicators=indicators,
+                sketches=sketches
+            )
+            strategy_instance.execute(client=client)
+        except Exception as error:
+            self.failure_counts[strategy_path] = self.failure_counts.get(strategy_path, 0) + 1
+            print(self.FAILED_MESSAGE.format(strategy_path.name, self.failure_counts[strategy_path], error))
+            traceback.print_exc()
+        finally:
+            self.run_counts[strategy_path] = self.run_counts.get(strategy_path, 0) + 1
+            self.last_durations[strategy_path] = time.perf_counter() - started_at
+
+    def display_summary(self) -> None:
+        print("=== Strategies ===")
+        for strategy_path in self.strategy.strategy_paths:
+            print(
+                f"{strategy_path.name:<30} runs {self.run_counts.get(strategy_path, 0):>6}  "
+                f"failures {self.failure_counts.get(strategy_path, 0):>4}  "
+                f"last {self.last_durations.get(strategy_path, 0.0) * 1000:>8.1f} ms"
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,203 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+from websocket import create_connection
+from websocket import WebSocketException
+from websocket import WebSocketTimeoutException
+
+# Reconnect delay grows as BACKOFF_BASE_SEC * 2 ** retry_count, capped by max_retry_wait_sec,
+# and the actual wait is drawn uniformly from [0, delay] ("full jitter")
+BACKOFF_BASE_SEC = 0.5
+# The exponent stops growing here; a long outage would otherwise overflow the float conversion
+BACKOFF_MAX_EXPONENT = 32
+
+# Binance closes every stream connection after 24 hours; rotate well before that
+DEFAULT_ROTATE_AFTER_SEC = 23 * 60 * 60 + 30 * 60
+
+def backoff_with_jitter(retry_count: int, max_wait_sec: float) -> float:
+    return random.uniform(0, min(max_wait_sec, BACKOFF_BASE_SEC * 2 ** min(retry_count, BACKOFF_MAX_EXPONENT)))
+
+class StreamConnection(threading.Thread):
+    """One websocket connection that pushes raw messages into the shared feed queue and reconnects on its own."""
+
+    def __init__(self, feed: "StreamFeed", connection_name: str, initial_socket=None):
+        super().__init__(name=connection_name, daemon=True)
+        self.feed = feed
+        self.connection_name = connection_name
+        self.initial_socket = initial_socket
+        self.connected_at = None # time.monotonic() of the current connection
+        self.first_message_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.ws_conn = None
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        ws_conn = self.ws_conn
+        if ws_conn is not None:
+            try:
+                ws_conn.close()
+            except (OSError, WebSocketException):
+                pass
+
+    @property
+    def age_sec(self) -> float:
+        if self.connected_at is None:
+            return 0.0
+        return time.monotonic() - self.connected_at
+
+    def run(self) -> None:
+        feed = self.feed
+        retry_count = 0
+
+        while not self.stop_event.is_set():
+            try:
+                # The pre-connected socket from startup warm-up is only good for the first attempt
+                initial_socket, self.initial_socket = self.initial_socket, None
+                self.ws_conn = create_connection(
+                    feed.wss_url,
+                    timeout=feed.connect_timeout_sec,
+                    socket=initial_socket
+                )
+                self.ws_conn.settimeout(feed.recv_timeout_sec)
+                self.connected_at = time.monotonic()
+                retry_count = 0
+
+                now_timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                print(f"[INFO] {self.connection_name} connected to {feed.wss_url} at {now_timestamp_str} via WebSocket.")
+
+                self.receive_messages()
+
+            except (ConnectionError, OSError, WebSocketException) as error:
+                if self.stop_event.is_set():
+                    break
+                retry_count += 1
+                wait = backoff_with_jitter(retry_count, feed.max_retry_wait_sec)
+                print(f"[WS ERROR] {self.connection_name}: {error}, retry in {wait:.2f}s")
+                self.stop_event.wait(wait)
+
+            finally:
+                if self.ws_conn is not None:
+                    try:
+                        self.ws_conn.close()
+                    except (OSError, WebSocketException):
+                        pass
+                    self.ws_conn = None
+
+    def receive_messages(self) -> None:
+        feed = self.feed
+        message_queue = feed.message_queue
+        last_recv_time = time.time()
+
+        while not self.stop_event.is_set():
+            # Raise WebSocketTimeoutException if no message is received within recv_timeout_sec
+            try:
+                raw_message = self.ws_conn.recv()
+            except WebSocketTimeoutException:
+                if (time.time() - last_recv_time) > feed.max_retry_wait_sec:
+                    raise ConnectionError(f"[INFO] No data for {feed.max_retry_wait_sec}s")
+                continue
+
+            if not raw_message:
+                raise ConnectionError("[ERROR] Empty message received.")
+
+            last_recv_time = time.time()
+            message_queue.put(raw_message)
+            if not self.first_message_event.is_set():
+                self.first_message_event.set()
+
+class StreamFeed:
+    """Merge one or two websocket connections into a single message queue.
+
+    - Each connection reconnects with exponential backoff and jitter.
+    - A replacement connection is opened before the 24h cutoff and the old one
+      is only closed once the replacement has delivered data.
+    - With standby enabled a second connection runs permanently; Manager drops
+      the duplicate trades by aggTrade id.
+    """
+
+    ROTATE_MESSAGE = "[INFO] {} is {:.0f}s old, opening replacement ahead of the 24h disconnect."
+    ROTATED_MESSAGE = "[INFO] {} replaced by {}."
+    ROTATE_TIMEOUT_MESSAGE = "[WARN] Replacement {} delivered nothing within {:.0f}s; keeping {} and trying again."
+
+    def __init__(
+        self,
+        wss_url: str,
+        connect_timeout_sec: int,
+        recv_timeout_sec: int,
+        max_retry_wait_sec: int,
+        standby_enabled: bool = False,
+        rotate_after_sec: int = DEFAULT_ROTATE_AFTER_SEC,
+        initial_socket=None,
+    ):
+        self.wss_url = wss_url
+        self.connect_timeout_sec = connect_timeout_sec
+        self.recv_timeout_sec = recv_timeout_sec
+        self.max_retry_wait_sec = max_retry_wait_sec
+        self.standby_enabled = standby_enabled
+        self.rotate_after_sec = rotate_after_sec
+        self.initial_socket = initial_socket
+
+        self.message_queue = queue.SimpleQueue()
+        self.connections = []
+        self.connection_counter = 0
+        self.stop_event = threading.Event()
+        self.supervisor = threading.Thread(target=self.supervise, name="StreamFeedSupervisor", daemon=True)
+
+    def start(self) -> None:
+        self.connections.append(self.open_connection(initial_socket=self.initial_socket))
+        if self.standby_enabled:
+            self.connections.append(self.open_connection())
+        self.supervisor.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        for connection in self.connections:
+            connection.stop()
+
+    def recv(self, timeout: float):
+        # Raises queue.Empty when no connection delivered anything within timeout
+        return self.message_queue.get(timeout=timeout)
+
+    def open_connection(self, initial_socket=None) -> StreamConnection:
+        self.connection_counter += 1
+        connection = StreamConnection(
+            feed=self,
+            connection_name=f"stream-{self.connection_counter}",
+            initial_socket=initial_socket
+        )
+        connection.start()
+        return connection
+
+    def supervise(self) -> None:
+        while not self.stop_event.wait(1.0):
+            for index, connection in enumerate(list(self.connections)):
+                if connection.age_sec < self.rotate_after_sec:
+                    continue
+
+                print(self.ROTATE_MESSAGE.format(connection.connection_name, connection.age_sec))
+                replacement = self.open_connection()
+
+                # Keep the old connection until the replacement is delivering data; give up after
+                # one connect plus the longest reconnect wait, and try again on the next pass
+                replacement_timeout_sec = self.connect_timeout_sec + self.max_retry_wait_sec
+                replacement_deadline = time.monotonic() + replacement_timeout_sec
+                while not replacement.first_message_event.wait(1.0):
+                    if self.stop_event.is_set():
+                        replacement.stop()
+                        return
+                    if time.monotonic() >= replacement_deadline:
+                        break
+
+                if not replacement.first_message_event.is_set():
+                    replacement.stop()
+                    print(self.ROTATE_TIMEOUT_MESSAGE.format(replacement.connection_name, replacement_timeout_sec, connection.connection_name))
+                    continue
+
+                self.connections[index] = replacement
+                connection.stop()
+                print(self.ROTATED_MESSAGE.format(connection.connection_name, replacement.connection_name))
@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import gc
+import linecache
+import signal
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from pangolin.soak import read_rss_bytes
+
+class MemoryTelemetry(threading.Thread):
+    """Memory and GC telemetry for long-running processes.
+
+    - RSS, live GC-tracked objects and per-generation collection counts are
+      sampled every `interval_sec` and appended to telemetry.csv.
+    - Every collection is timed through gc.callbacks. Pauses on the stream
+      loop thread (the main thread) are counted separately, because those
+      delay message processing directly.
+    - SIGUSR2 starts tracemalloc; each further SIGUSR2 writes the top
+      allocation sites, and the growth since the previous snapshot, to the
+      data folder.
+    """
+
+    CSV_HEADER = "time,elapsed_sec,rss_mb,gc_objects,gc_frozen,gen0,gen1,gen2,pauses,pause_total_ms,pause_max_ms,stream_pauses,stream_pause_total_ms\n"
+    REPORT_MESSAGE = "[Telemetry] rss {:.1f} MB  objects {}  collections {}/{}/{}  pauses {} (stream loop {}, p99 {:.2f} ms, max {:.2f} ms, total {:.1f} ms)"
+    TRACEMALLOC_STARTED_MESSAGE = "[Telemetry] tracemalloc started ({} frames); send SIGUSR2 again for a snapshot."
+    SNAPSHOT_MESSAGE = "[Telemetry] Top allocation sites written to {}."
+    FROZEN_MESSAGE = "[Telemetry] {} startup objects frozen out of GC tracking."
+
+    def __init__(self, output_folder_path: Path, interval_sec: int = 60, top_count: int = 25, tracemalloc_frames: int = 10):
+        super().__init__(name="MemoryTelemetry", daemon=True)
+        self.output_folder_path = Path(output_folder_path)
+        self.csv_file_path = self.output_folder_path / "telemetry.csv"
+        self.interval_sec = int(interval_sec)
+        self.top_count = int(top_count)
+        self.tracemalloc_frames = int(tracemalloc_frames)
+
+        self.started_at = time.monotonic()
+        self.stream_thread_id = threading.main_thread().ident
+
+        # Written only from the GC callback, which runs with the GIL held
+        self.collection_started_at = None
+        self.pause_count = 0
+        self.pause_total_sec = 0.0
+        self.pause_max_sec = 0.0
+        self.stream_pause_count = 0
+        self.stream_pause_total_sec = 0.0
+        self.recent_pauses_ms = deque(maxlen=1000) # (generation, milliseconds, on stream loop)
+
+        self.snapshot_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.previous_snapshot = None
+
+    def install(self) -> None:
+        gc.callbacks.append(self.on_gc)
+
+    def install_signal_handler(self) -> None:
+        # signal.signal() is only allowed from the main thread
+        if hasattr(signal, "SIGUSR2"):
+            signal.signal(signal.SIGUSR2, lambda signum, frame: self.snapshot_event.set())
+
+    def freeze_startup_objects(self) -> None:
+        # Objects created during startup live for the whole run; move them out of every future collection
+        gc.collect()
+        gc.freeze()
+        print(self.FROZEN_MESSAGE.format(gc.get_freeze_count()))
+
+    def on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self.collection_started_at = time.perf_counter()
+            return
+        if self.collection_started_at is None:
+            return
+
+        pause_sec = time.perf_counter() - self.collection_started_at
+        self.collection_started_at = None
+        on_stream_loop = threading.get_ident() == self.stream_thread_id
+
+        self.pause_count += 1
+        self.pause_total_sec += pause_sec
+        if pause_sec > self.pause_max_sec:
+            self.pause_max_sec = pause_sec
+        if on_stream_loop:
+            self.stream_pause_count += 1
+            self.stream_pause_total_sec += pause_sec
+        self.recent_pauses_ms.append((info["generation"], pause_sec * 1000, on_stream_loop))
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.join()
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+
+    def run(self) -> None:
+        self.output_folder_path.mkdir(parents=True, exist_ok=True)
+        write_header = not self.csv_file_path.exists()
+        next_sample_at = time.monotonic()
+
+        with open(self.csv_file_path, "a", encoding="utf-8") as csv_file:
+            if write_header:
+                csv_file.write(self.CSV_HEADER)
+
+            while not self.stop_event.is_set():
+                if self.snapshot_event.wait(max(0.0, next_sample_at - time.monotonic())):
+                    self.snapshot_event.clear()
+                    self.handle_snapshot_request()
+                    continue
+
+                self.write_sample(csv_file)
+                next_sample_at = time.monotonic() + self.interval_sec
+
+            self.write_sample(csv_file)
+
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def write_sample(self, csv_file) -> None:
+        rss_mb = read_rss_bytes() / 1024 / 1024
+        gc_objects = len(gc.get_objects())
+        collections = [generation_stats["collections"] for generation_stats in gc.get_stats()]
+
+        csv_file.write(
+            f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')},{time.monotonic() - self.started_at:.0f},{rss_mb:.1f},"
+            f"{gc_objects},{gc.get_freeze_count()},{collections[0]},{collections[1]},{collections[2]},"
+            f"{self.pause_count},{self.pause_total_sec * 1000:.3f},{self.pause_max_sec * 1000:.3f},"
+            f"{self.stream_pause_count},{self.stream_pause_total_sec * 1000:.3f}\n"
+        )
+        csv_file.flush()
+
+        # p99 over the most recent pauses, so a change in GC behaviour shows up quickly
+        recent_pauses_ms = sorted(pause_ms for _, pause_ms, _ in list(self.recent_pauses_ms))
+        recent_p99_ms = recent_pauses_ms[int(len(recent_pauses_ms) * 0.99)] if recent_pauses_ms else 0.0
+
+        print(self.REPORT_MESSAGE.format(
+            rss_mb, gc_objects, *collections, self.pause_count, self.stream_pause_count,
+            recent_p99_ms, self.pause_max_sec * 1000, self.pause_total_sec * 1000
+        ))
+
+    def handle_snapshot_request(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            print(self.TRACEMALLOC_STARTED_MESSAGE.format(self.tracemalloc_frames))
+            return
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            # Source lines cached while formatting the previous snapshot's traceback
+            tracemalloc.Filter(False, linecache.__file__),
+        ))
+        snapshot_file_path = self.output_folder_path / f"tracemalloc_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+
+        with open(snapshot_file_path, "w", encoding="utf-8") as snapshot_file:
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+            snapshot_file.write(f"# traced {traced_current / 1024 / 1024:.1f} MB, peak {traced_peak / 1024 / 1024:.1f} MB\n")
+
+            snapshot_file.write(f"\n=== Top {self.top_count} allocation sites ===\n")
+            for statistic in snapshot.statistics("lineno")[:self.top_count]:
+                snapshot_file.write(f"{statistic}\n")
+
+            # Growth since the previous snapshot is where creep shows up
+            if self.previous_snapshot is not None:
+                snapshot_file.write(f"\n=== Top {self.top_count} changes since previous snapshot ===\n")
+                for statistic in snapshot.compare_to(self.previous_snapshot, "lineno")[:self.top_count]:
+                    snapshot_file.write(f"{statistic}\n")
+
+            snapshot_file.write("\n=== Largest allocation site, full traceback ===\n")
+            top_statistics = snapshot.statistics("traceback")
+            if top_statistics:
+                snapshot_file.write("\n".join(top_statistics[0].traceback.format()) + "\n")
+
+        self.previous_snapshot = snapshot
+        print(self.SNAPSHOT_MESSAGE.format(snapshot_file_path))
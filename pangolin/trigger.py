@@ -0,0 +1,339 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests
+
+class ExitTriggerEngine(threading.Thread):
+    """Client-side take-profit / stop-loss trigger driven by stream prices.
+
+    Client hands over each accepted entry order with watch_entry(). This
+    thread polls the order and arms the position once it has filled (or
+    partially filled, for the executed quantity). Arming stores the levels
+    together with signed reduce-only MARKET exit orders. Manager calls
+    on_price() for every trade; the check is two float comparisons, and a
+    hit hands the already signed body to a sender thread so the stream loop
+    never waits on the exchange.
+
+    A signature is only accepted within recvWindow of its timestamp, so this
+    thread re-signs the armed exits every `resign_interval_sec`. Exchange-side
+    STOP_MARKET / TAKE_PROFIT_MARKET orders are placed at the same levels as a
+    backstop for when this process or its stream is down; whichever side fires
+    second is rejected because the position is already closed.
+    """
+
+    ARMED_MESSAGE = "[Trigger] Armed {} {} exit: take profit {} / stop loss {}."
+    QUANTITY_MESSAGE = "[Trigger] Entry filled further; exit quantity is now {}."
+    WATCHING_MESSAGE = "[Trigger] Waiting for entry order {} to fill before arming."
+    ENTRY_CLOSED_MESSAGE = "[Trigger] Entry order {} is {}; no longer watching it."
+    ENTRY_POLL_FAILED_MESSAGE = "[WARN] Entry order {} status check failed: {}"
+    FIRED_MESSAGE = "[Trigger] {} hit at {} ({:.3f} ms after the trade was processed)."
+    SEND_FAILED_MESSAGE = "[ERROR] Exit order {} failed: {} {}"
+    SEND_ERROR_MESSAGE = "[ERROR] Exit order {} not sent (attempt {}/{}): {}"
+    NO_EXIT_MESSAGE = "[ERROR] {} exit was not placed; {}."
+    BACKSTOP_FAILED_MESSAGE = "[WARN] Exchange-side {} backstop not placed: {} {}"
+    BACKSTOP_CANCEL_FAILED_MESSAGE = "[WARN] Exchange-side backstop orders not cancelled: {}"
+    RESIGN_FAILED_MESSAGE = "[WARN] Armed exits not re-signed: {}"
+
+    RECV_WINDOW_MS = 10000
+    FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+    ENTRY_POLL_INTERVAL_SEC = 0.5
+    FILLED_STATUSES = ("FILLED", "PARTIALLY_FILLED")
+    CLOSED_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "EXPIRED_IN_MATCH", "REJECTED")
+
+    # The same signed body is resent; newClientOrderId makes a repeat of a request that did arrive a rejected duplicate
+    SEND_ATTEMPTS = 3
+    SEND_RETRY_WAIT_SEC = 0.2
+
+    def __init__(self, backstop_enabled: bool = True, resign_interval_sec: float = 5.0, client=None):
+        super().__init__(name="ExitTrigger", daemon=True)
+        self.client = client # Set by Client when the engine is passed to it
+        self.backstop_enabled = backstop_enabled
+        self.resign_interval_sec = resign_interval_sec
+
+        # (is_long, take_profit_price, stop_loss_price, take_profit_body, stop_loss_body, signed_at);
+        # swapped as one reference so on_price() never needs a lock
+        self.armed = None
+        self.armed_lock = threading.Lock() # Serializes arm, re-sign and fire, not the per-trade check
+
+        # (side, order id, take profit price, stop loss price, armed quantity) of the entry being watched;
+        # the strategy thread and the polling thread both move it forward, so only under entry_lock
+        self.pending_entry = None
+        self.entry_lock = threading.Lock()
+
+        self.order_parameters = None
+        self.backstop_client_order_ids = []
+        self.arm_count = 0
+        self.fired_count = 0
+        self.sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ExitSender")
+        self.stop_event = threading.Event()
+
+    def arm(self, side: str, quantity, take_profit_price, stop_loss_price) -> None:
+        exit_side = "SELL" if side == "BUY" else "BUY"
+        self.arm_count += 1
+        client_order_id_prefix = f"pgl-{int(time.time())}-{self.arm_count}"
+
+        with self.armed_lock:
+            self.order_parameters = {
+                "take profit": {
+                    "symbol": self.client.active_symbol,
+                    "side": exit_side,
+                    "type": "MARKET",
+                    "quantity": str(quantity),
+                    "reduceOnly": "true",
+                    "newClientOrderId": client_order_id_prefix + "-tp",
+                },
+                "stop loss": {
+                    "symbol": self.client.active_symbol,
+                    "side": exit_side,
+                    "type": "MARKET",
+                    "quantity": str(quantity),
+                    "reduceOnly": "true",
+                    "newClientOrderId": client_order_id_prefix + "-sl",
+                },
+            }
+            self.armed = self.sign_exits(side == "BUY", float(take_profit_price), float(stop_loss_price))
+
+        print(self.ARMED_MESSAGE.format(side, quantity, take_profit_price, stop_loss_price))
+
+        if self.backstop_enabled:
+            self.place_backstop_orders(exit_side, take_profit_price, stop_loss_price, client_order_id_prefix)
+
+    def disarm(self) -> None:
+        with self.armed_lock:
+            self.armed = None
+        with self.entry_lock:
+            self.pending_entry = None
+
+    @property
+    def is_active(self) -> bool:
+        # An entry is still filling or a position is armed; the stream has to keep running
+        return self.pending_entry is not None or self.armed is not None
+
+    def watch_entry(self, side: str, order_response: dict, take_profit_price, stop_loss_price) -> None:
+        order_id = order_response["orderId"]
+        with self.entry_lock:
+            self.pending_entry = (side, order_id, take_profit_price, stop_loss_price, Decimal(0))
+        print(self.WATCHING_MESSAGE.format(order_id))
+
+        # A marketable order can already be filled in the placement response
+        self.handle_entry_status(order_response)
+
+    def poll_entry(self) -> None:
+        pending_entry = self.pending_entry
+        if pending_entry is None:
+            return
+        try:
+            order_response = self.client.retrieve_binance_futures_order(pending_entry[1])
+        except (requests.RequestException, KeyError, ValueError) as error:
+            print(self.ENTRY_POLL_FAILED_MESSAGE.format(pending_entry[1], error))
+            return
+        if order_response is None:
+            print(self.ENTRY_POLL_FAILED_MESSAGE.format(pending_entry[1], "no order in the response"))
+            return
+        self.handle_entry_status(order_response)
+
+    def handle_entry_status(self, order_response: dict) -> None:
+        # The placement response and a poll can report the same fill at once; whichever comes second
+        # sees the quantity the first one armed and does nothing
+        with self.entry_lock:
+            self.advance_entry(order_response)
+
+    def advance_entry(self, order_response: dict) -> None:
+        pending_entry = self.pending_entry
+        if pending_entry is None or pending_entry[1] != order_response.get("orderId"):
+            return
+        side, order_id, take_profit_price, stop_loss_price, armed_quantity = pending_entry
+        status = order_response.get("status")
+
+        # The armed exit already fired or was disarmed; a further fill is not followed
+        if armed_quantity and self.armed is None:
+            self.pending_entry = None
+            print(self.ENTRY_CLOSED_MESSAGE.format(order_id, "no longer armed"))
+            return
+
+        if status in self.FILLED_STATUSES:
+            executed_quantity = Decimal(order_response.get("executedQty", "0"))
+            if executed_quantity > armed_quantity:
+                if armed_quantity:
+                    self.update_quantity(executed_quantity)
+                else:
+                    self.arm(side, executed_quantity, take_profit_price, stop_loss_price)
+                self.pending_entry = (side, order_id, take_profit_price, stop_loss_price, executed_quantity)
+
+        if status in self.CLOSED_STATUSES:
+            self.pending_entry = None
+            if status != "FILLED":
+                print(self.ENTRY_CLOSED_MESSAGE.format(order_id, status))
+
+    def update_quantity(self, quantity) -> None:
+        with self.armed_lock:
+            armed = self.armed
+            if armed is None:
+                return
+            for order_parameters in self.order_parameters.values():
+                order_parameters["quantity"] = str(quantity)
+            self.armed = self.sign_exits(armed[0], armed[1], armed[2])
+        print(self.QUANTITY_MESSAGE.format(quantity))
+
+    def sign_exits(self, is_long: bool, take_profit_price: float, stop_loss_price: float) -> tuple:
+        take_profit_body = self.sign_order_body(self.order_parameters["take profit"])
+        stop_loss_body = self.sign_order_body(self.order_parameters["stop loss"])
+        return is_long, take_profit_price, stop_loss_price, take_profit_body, stop_loss_body, time.monotonic()
+
+    def sign_order_body(self, order_parameters: dict) -> bytes:
+        signed_parameters = self.client.sign_binance_params({
+            **order_parameters,
+            "recvWindow": self.RECV_WINDOW_MS,
+            "timestamp": self.client.retrieve_binance_server_time(),
+        })
+        return urllib.parse.urlencode(signed_parameters).encode("ascii")
+
+    def on_price(self, price: float) -> None:
+        armed = self.armed
+        if armed is None:
+            return
+
+        is_long, take_profit_price, stop_loss_price = armed[0], armed[1], armed[2]
+        if is_long:
+            if price >= take_profit_price:
+                self.fire(armed, "take profit", price)
+            elif price <= stop_loss_price:
+                self.fire(armed, "stop loss", price)
+        else:
+            if price <= take_profit_price:
+                self.fire(armed, "take profit", price)
+            elif price >= stop_loss_price:
+                self.fire(armed, "stop loss", price)
+
+    def fire(self, armed: tuple, exit_name: str, price: float) -> None:
+        fired_at = time.perf_counter()
+        with self.armed_lock:
+            # Another price already fired this position
+            if self.armed is not armed:
+                return
+            self.armed = None
+
+        order_body = armed[3] if exit_name == "take profit" else armed[4]
+        self.fired_count += 1
+        self.sender.submit(self.send_exit, exit_name, order_body, price, fired_at)
+
+    def send_exit(self, exit_name: str, order_body: bytes, price: float, fired_at: float) -> None:
+        # Runs on the sender pool, whose futures nobody reads; every failure has to be reported here
+        response = None
+        for attempt in range(1, self.SEND_ATTEMPTS + 1):
+            try:
+                response = self.client.session.post(
+                    self.client.binance_futures_order_url,
+                    headers={"X-MBX-APIKEY": self.client.active_api_key, **self.FORM_HEADERS},
+                    data=order_body,
+                )
+            except requests.RequestException as error:
+                print(self.SEND_ERROR_MESSAGE.format(exit_name, attempt, self.SEND_ATTEMPTS, error))
+                response = None
+            else:
+                # 5xx: the exchange may not have processed it; anything else is final
+                if response.status_code < 500:
+                    break
+                print(self.SEND_ERROR_MESSAGE.format(exit_name, attempt, self.SEND_ATTEMPTS, response.status_code))
+            time.sleep(self.SEND_RETRY_WAIT_SEC)
+
+        print(self.FIRED_MESSAGE.format(exit_name.capitalize(), price, (time.perf_counter() - fired_at) * 1000))
+
+        if response is None or response.status_code != 200:
+            if response is not None:
+                print(self.SEND_FAILED_MESSAGE.format(exit_name, response.status_code, response.text))
+            # Leave the backstop orders in place; they are now the only exit
+            if self.backstop_client_order_ids:
+                print(self.NO_EXIT_MESSAGE.format(exit_name.capitalize(), "the exchange-side backstop orders stay in place"))
+            else:
+                print(self.NO_EXIT_MESSAGE.format(exit_name.capitalize(), "the position has no exit, close it manually"))
+            return
+
+        # The position is closed; the backstop orders are no longer needed
+        try:
+            self.cancel_backstop_orders()
+        except requests.RequestException as error:
+            print(self.BACKSTOP_CANCEL_FAILED_MESSAGE.format(error))
+
+    def place_backstop_orders(self, exit_side: str, take_profit_price, stop_loss_price, client_order_id_prefix: str) -> None:
+        backstop_orders = {
+            "take profit": ("TAKE_PROFIT_MARKET", take_profit_price, client_order_id_prefix + "-tpx"),
+            "stop loss": ("STOP_MARKET", stop_loss_price, client_order_id_prefix + "-slx"),
+        }
+
+        self.backstop_client_order_ids = []
+        for exit_name, (order_type, stop_price, client_order_id) in backstop_orders.items():
+            response = self.client.session.post(
+                self.client.binance_futures_order_url,
+                headers={"X-MBX-APIKEY": self.client.active_api_key},
+                data=self.client.sign_binance_params({
+                    "symbol": self.client.active_symbol,
+                    "side": exit_side,
+                    "type": order_type,
+                    "stopPrice": str(stop_price),
+                    "closePosition": "true",
+                    "workingType": "CONTRACT_PRICE",
+                    "newClientOrderId": client_order_id,
+                    "timestamp": self.client.retrieve_binance_server_time(),
+                }),
+            )
+            if response.status_code == 200:
+                self.backstop_client_order_ids.append(client_order_id)
+            else:
+                print(self.BACKSTOP_FAILED_MESSAGE.format(exit_name, response.status_code, response.text))
+
+    def cancel_backstop_orders(self) -> None:
+        backstop_client_order_ids, self.backstop_client_order_ids = self.backstop_client_order_ids, []
+        for client_order_id in backstop_client_order_ids:
+            self.client.session.delete(
+                self.client.binance_futures_order_url,
+                headers={"X-MBX-APIKEY": self.client.active_api_key},
+                params=self.client.sign_binance_params({
+                    "symbol": self.client.active_symbol,
+                    "origClientOrderId": client_order_id,
+                    "timestamp": self.client.retrieve_binance_server_time(),
+                }),
+            )
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.sender.shutdown(wait=True)
+
+    def run(self) -> None:
+        next_resign_at = time.monotonic() + self.resign_interval_sec
+
+        while True:
+            # Poll a filling entry often; otherwise only wake up to re-sign
+            wait_sec = max(0.0, next_resign_at - time.monotonic())
+            if self.pending_entry is not None:
+                wait_sec = min(wait_sec, self.ENTRY_POLL_INTERVAL_SEC)
+            if self.stop_event.wait(wait_sec):
+                break
+
+            if self.pending_entry is not None:
+                self.poll_entry()
+
+            if time.monotonic() >= next_resign_at:
+                next_resign_at = time.monotonic() + self.resign_interval_sec
+                try:
+                    self.resign_armed()
+                except requests.RequestException as error:
+                    print(self.RESIGN_FAILED_MESSAGE.format(error))
+
+    def resign_armed(self) -> None:
+        # Keep the armed signatures inside recvWindow
+        armed = self.armed
+        if armed is None:
+            return
+
+        with self.armed_lock:
+            # Fired or re-armed while waiting for the lock
+            if self.armed is not armed:
+                return
+            self.armed = self.sign_exits(armed[0], armed[1], armed[2])